@@ -1,9 +1,7 @@
 import streamlit as st
-import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import time # Untuk simulasi loading atau jeda
 from PIL import Image # Tambahkan import ini untuk gambar
+from utils.login_index import get_login_index, lookup_mentor
 
 # --- Inisialisasi session_state ---
 # Ini penting untuk memastikan kunci-kunci ada bahkan di awal aplikasi
@@ -107,33 +105,13 @@ h1 {
 
 
 # --- Setup Google Sheets ---
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-mentor_df = pd.DataFrame() # Inisialisasi kosong
-CLIENT = None
-SHEET = None
-
-# Menggunakan st.cache_resource untuk menyimpan koneksi dan data mentor
-# Ini akan mencegah koneksi ulang dan pembacaan data berulang setiap refresh
-@st.cache_resource(ttl=3600) # Cache selama 1 jam
-def get_google_sheet_data():
-    try:
-        creds = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", SCOPE)
-        client = gspread.authorize(creds)
-        sheet = client.open("Presensi Mentoring STT NF") # Ganti dengan nama spreadsheet Anda
-
-        # Muat data mentor
-        df = pd.DataFrame(sheet.worksheet("mentor").get_all_records())
-        df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(0).astype(int)
-        return client, sheet, df
-    except FileNotFoundError:
-        st.error("Error: File 'service_account.json' tidak ditemukan di direktori proyek. Pastikan file ada.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Gagal terhubung ke Google Sheet: {e}. Pastikan kredensial service account benar dan Google Sheets API aktif.")
-        st.stop()
-    return None, None, pd.DataFrame() # Return kosong jika ada error
-
-CLIENT, SHEET, mentor_df = get_google_sheet_data()
+# Indeks login mentor (utils.login_index) dipanaskan saat halaman dibuka dan dipakai bersama
+# semua sesi, sehingga menekan tombol Login cukup satu lookup tanpa memindai data mentor
+try:
+    mentor_index = get_login_index()
+except Exception as e:
+    st.error(f"Gagal memuat data mentor dari Google Sheet: {e}. Pastikan kredensial service account benar dan Google Sheets API aktif.")
+    st.stop()
 
 
 # --- Tampilan Form Login ---
@@ -165,21 +143,21 @@ with col1:
                 st.error("Email Admin salah.")
         elif role == "Mentor":
             if email:
-                if not mentor_df.empty:
-                    match = mentor_df[mentor_df['email'] == email]
-                    if not match.empty:
-                        st.session_state.logged_in = True
-                        st.session_state.role = "Mentor"
-                        st.session_state.user_name = match.iloc[0]['nama']
-                        st.session_state.email = email
-                        st.session_state.mentor_id = match.iloc[0]['id']
-                        st.success(f"Login sebagai {match.iloc[0]['nama']} berhasil. Mengalihkan...")
-                        time.sleep(1) # Beri waktu pengguna melihat pesan sukses
-                        st.rerun() # Gunakan st.rerun() setelah mengubah session state
-                    else:
-                        st.error("Email Mentor tidak ditemukan.")
-                else:
+                match = lookup_mentor(email)
+                if match is not None:
+                    found_mentor_id, found_name = match
+                    st.session_state.logged_in = True
+                    st.session_state.role = "Mentor"
+                    st.session_state.user_name = found_name
+                    st.session_state.email = email
+                    st.session_state.mentor_id = found_mentor_id
+                    st.success(f"Login sebagai {found_name} berhasil. Mengalihkan...")
+                    time.sleep(1) # Beri waktu pengguna melihat pesan sukses
+                    st.rerun() # Gunakan st.rerun() setelah mengubah session state
+                elif not mentor_index:
                     st.error("Data mentor tidak dapat dimuat. Cek koneksi Google Sheets.")
+                else:
+                    st.error("Email Mentor tidak ditemukan.")
             else:
                 st.error("Email harus diisi.")
     
@@ -1,9 +1,16 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from datetime import datetime
 from utils.auth_utils import require_login
+from utils.data_loader import load_frames
+from utils.fact_table import get_facts_by_date, get_search_index
+from utils.pagination import paginated_dataframe
+from utils.export_utils import ARCHIVE_FORMATS, build_archive
+from utils.write_queue import queue_status
+from utils.sheets_utils import scheduler_stats
+from utils.login_index import login_stats
+from utils.analytics import attendance_by_meeting, attendance_summary, attendance_trend, mentor_ranking, status_distribution
 
 # --- Cek Login ---
 require_login()
@@ -14,58 +21,23 @@ user_name = st.session_state.get("user_name")
 
 
 # --- Setup Google Sheets ---
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-mentor_df = pd.DataFrame()
-mentee_df = pd.DataFrame()
-presensi_df = pd.DataFrame()
-CLIENT = None
-SHEET = None
-
-@st.cache_data(ttl=3600) # Cache data selama 1 jam untuk mencegah panggilan API berlebihan
-def load_data():
-    try:
-        CREDS = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", SCOPE)
-        CLIENT = gspread.authorize(CREDS)
-        SHEET = CLIENT.open("Presensi Mentoring STT NF") # Ganti dengan nama spreadsheet Anda
-
-        mentor_data = pd.DataFrame(SHEET.worksheet("mentor").get_all_records())
-        mentee_data = pd.DataFrame(SHEET.worksheet("mentee").get_all_records())
-        presensi_data = pd.DataFrame(SHEET.worksheet("presensi").get_all_records())
-        
-        return mentor_data, mentee_data, presensi_data
-    except FileNotFoundError:
-        st.error("Error: File 'service_account.json' tidak ditemukan di direktori proyek. Pastikan file ada.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Terjadi kesalahan saat memuat data dari Google Sheets: {e}. Pastikan kredensial service account benar dan Google Sheets API aktif.")
-        st.stop()
-
-# Gunakan spinner saat memuat data
-with st.spinner(""):
-    mentor_df, mentee_df, presensi_df = load_data()
-
-
-# --- Konversi tipe data numerik dan olah status_kehadiran ---
-# Kolom 'id', 'mentor_id', 'mentee_id', 'pertemuan' tetap numerik
-for df_var in ['mentor_df', 'mentee_df', 'presensi_df']:
-    df = locals()[df_var] # Dapatkan DataFrame dari variabel lokal
-    for col in ['id', 'mentor_id', 'mentee_id', 'pertemuan']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-    locals()[df_var] = df # Perbarui DataFrame di variabel lokal
-
-# Olah kolom 'status_kehadiran' di presensi_df
-if 'status_kehadiran' in presensi_df.columns:
-    presensi_df['hadir_hitung'] = presensi_df['status_kehadiran'].apply(lambda x: 1 if x == 'Hadir' else 0)
-else:
+# Data dibaca lewat utils.data_loader: DataFrame bertipe (lihat utils.schema) yang dipakai bersama semua halaman
+try:
+    with st.spinner(""):
+        mentor_df, mentee_df = load_frames("mentor", "mentee")
+        # Tabel fakta presensi (utils.fact_table: tiap baris sudah membawa mentor_id, nama mentee, kelompok,
+        # dan nama mentor) bertanggal valid, terurut menurut tanggal (utils.date_index), dipakai bersama semua sesi
+        presensi_by_date = get_facts_by_date()
+except Exception as e:
+    st.error(f"Terjadi kesalahan saat memuat data dari Google Sheets: {e}. Pastikan kredensial service account benar dan Google Sheets API aktif.")
+    st.stop()
+
+# Kolom 'is_hadir' (True jika status 'Hadir') sudah dihitung oleh loader
+if 'status_kehadiran' not in presensi_by_date.frame.columns:
     st.warning("Kolom 'status_kehadiran' tidak ditemukan di data presensi. Pastikan Google Sheet sudah diperbarui.")
-    presensi_df['hadir_hitung'] = 0 # Fallback jika kolom tidak ada
 
-# Konversi kolom 'tanggal' ke datetime untuk filter dan analisis tren
-if 'tanggal' in presensi_df.columns:
-    presensi_df['tanggal'] = pd.to_datetime(presensi_df['tanggal'], errors='coerce')
-    presensi_df = presensi_df.dropna(subset=['tanggal']) # Hapus baris dengan tanggal yang tidak valid
-else:
+# Kolom 'tanggal' sudah bertipe datetime; baris dengan tanggal tidak valid sudah disisihkan oleh loader
+if 'tanggal' not in presensi_by_date.frame.columns:
     st.warning("Kolom 'tanggal' tidak ditemukan di data presensi. Fitur filter tanggal dan tren tidak akan berfungsi.")
 
 # --- Header Halaman ---
@@ -76,8 +48,8 @@ st.divider()
 
 # --- Filter Global (untuk Admin dan Mentor jika relevan) ---
 st.sidebar.header("Filter Data")
-min_date = presensi_df['tanggal'].min().date() if not presensi_df.empty else pd.to_datetime('2023-01-01').date()
-max_date = presensi_df['tanggal'].max().date() if not presensi_df.empty else pd.to_datetime('2024-12-31').date()
+min_date = presensi_by_date.min_date.date() if presensi_by_date.min_date is not None else pd.to_datetime('2023-01-01').date()
+max_date = presensi_by_date.max_date.date() if presensi_by_date.max_date is not None else pd.to_datetime('2024-12-31').date()
 
 date_range = st.sidebar.date_input(
     "Pilih Rentang Tanggal",
@@ -86,12 +58,18 @@ date_range = st.sidebar.date_input(
     max_value=max_date
 )
 
+# Grafik dan ringkasan dihitung oleh utils.analytics dengan filter yang sama (rentang tanggal
+# dan mentor), hasilnya di-memo dan dipakai bersama oleh sesi yang melihat data yang sama
 if len(date_range) == 2:
     start_date = pd.to_datetime(date_range[0])
     end_date = pd.to_datetime(date_range[1])
-    presensi_df_filtered = presensi_df[(presensi_df['tanggal'] >= start_date) & (presensi_df['tanggal'] <= end_date)]
+    rentang_baris = presensi_by_date.bounds(start_date, end_date) # Binary search pada tanggal terurut
+    presensi_df_filtered = presensi_by_date.frame.iloc[rentang_baris[0]:rentang_baris[1]]
+    filter_tanggal = {"start": start_date, "end": end_date}
 else:
-    presensi_df_filtered = presensi_df.copy()
+    rentang_baris = (0, len(presensi_by_date))
+    presensi_df_filtered = presensi_by_date.frame
+    filter_tanggal = {"start": pd.to_datetime(min_date)} # Hanya presensi bertanggal valid
     st.sidebar.info("Pilih rentang tanggal untuk memfilter data.")
 
 # --- Pesan Kosong yang Lebih Informatif ---
@@ -100,6 +78,8 @@ if presensi_df_filtered.empty:
 
 
 if role == "Admin":
+    ringkasan = attendance_summary(**filter_tanggal)
+
     # --- Kartu Statistik ---
     st.header("Ringkasan Data Umum")
     col1, col2, col3 = st.columns(3)
@@ -108,16 +88,40 @@ if role == "Admin":
     with col2:
         st.metric("🧑‍🎓 Total Mentee", len(mentee_df))
     with col3:
-        st.metric("🗓️ Total Presensi Dicatat", len(presensi_df_filtered))
+        st.metric("🗓️ Total Presensi Dicatat", ringkasan['total'])
+
+    # --- Status Antrian Penulisan ke Google Sheets ---
+    with st.expander("🔄 Status Sinkronisasi Google Sheets"):
+        status_antrian = queue_status()
+        col_q1, col_q2, col_q3 = st.columns(3)
+        with col_q1:
+            st.metric("Perubahan Tertunda", status_antrian["depth"])
+        with col_q2:
+            st.metric("Perubahan Gagal", status_antrian["failed"])
+        with col_q3:
+            if status_antrian["last_flush_at"]:
+                waktu_flush = datetime.fromtimestamp(status_antrian["last_flush_at"]).strftime("%H:%M:%S")
+                st.metric("Pengiriman Terakhir", waktu_flush, "Berhasil" if status_antrian["last_flush_ok"] else "Gagal",
+                          delta_color="normal" if status_antrian["last_flush_ok"] else "inverse")
+            else:
+                st.metric("Pengiriman Terakhir", "-")
+        if status_antrian["last_error"]:
+            st.caption(f"Error terakhir: {status_antrian['last_error']}")
+        stat_api = scheduler_stats()
+        st.caption(f"Panggilan API sejak server berjalan: {stat_api['read']} baca, {stat_api['write']} tulis, "
+                   f"{stat_api['collapsed']} pembacaan identik digabung, total antre {stat_api['waited_seconds']:.1f} detik.")
+        stat_login = login_stats()
+        st.caption(f"Login mentor: {stat_login['attempts']} percobaan ({stat_login['misses']} gagal, "
+                   f"{stat_login['refreshes']} baca ulang data mentor), latensi p50 {stat_login['p50_ms']:.1f} ms, "
+                   f"p95 {stat_login['p95_ms']:.1f} ms, maks {stat_login['max_ms']:.1f} ms.")
 
     st.divider()
 
     # --- Grafik Kehadiran per Pertemuan (Admin) ---
     st.header("Analisis Kehadiran Mentee")
     st.subheader("📈 Rata-rata Kehadiran Mentee per Pertemuan")
-    if not presensi_df_filtered.empty and 'hadir_hitung' in presensi_df_filtered.columns:
-        avg_hadir_per_pertemuan = presensi_df_filtered.groupby("pertemuan")["hadir_hitung"].mean().reset_index()
-        avg_hadir_per_pertemuan['Rata-rata Kehadiran (%)'] = avg_hadir_per_pertemuan['hadir_hitung'] * 100
+    if ringkasan['total'] > 0:
+        avg_hadir_per_pertemuan = attendance_by_meeting(**filter_tanggal)
         fig_avg = px.bar(avg_hadir_per_pertemuan, x="pertemuan", y="Rata-rata Kehadiran (%)",
                          title="Distribusi Rata-rata Kehadiran Mentee per Pertemuan",
                          labels={"pertemuan": "Pertemuan Ke-", "Rata-rata Kehadiran (%)": "Rata-rata Kehadiran (%)"},
@@ -128,8 +132,7 @@ if role == "Admin":
         st.caption("Grafik ini hanya menghitung status 'Hadir' untuk rata-rata kehadiran.")
 
         st.subheader("📊 Distribusi Status Kehadiran Keseluruhan")
-        status_counts = presensi_df_filtered['status_kehadiran'].value_counts().reset_index()
-        status_counts.columns = ['Status', 'Jumlah']
+        status_counts = status_distribution(**filter_tanggal)
         fig_pie = px.pie(status_counts, values='Jumlah', names='Status',
                          title='Persentase Status Kehadiran Global',
                          color_discrete_sequence=px.colors.qualitative.Pastel)
@@ -140,19 +143,12 @@ if role == "Admin":
 
         st.subheader("📉 Tren Rata-rata Kehadiran Mingguan")
         if 'tanggal' in presensi_df_filtered.columns:
-            presensi_df_filtered['tanggal'] = pd.to_datetime(presensi_df_filtered['tanggal'])
-
-            # Mengubah pengelompokan menjadi mingguan
-            presensi_df_filtered['minggu_tahun'] = presensi_df_filtered['tanggal'].dt.to_period('W').astype(str)
-            avg_hadir_minggu = presensi_df_filtered.groupby('minggu_tahun')['hadir_hitung'].mean().reset_index()
-            avg_hadir_minggu['Rata-rata Kehadiran (%)'] = avg_hadir_minggu['hadir_hitung'] * 100
-
-            # Urutkan berdasarkan minggu_tahun untuk plot yang benar
-            avg_hadir_minggu = avg_hadir_minggu.sort_values('minggu_tahun')
+            # Rollup mingguan dari deret harian (utils.timeseries); 'minggu_tahun' = tanggal Senin awal minggu
+            avg_hadir_minggu = attendance_trend('W', **filter_tanggal).rename(columns={'periode': 'minggu_tahun'})
 
             fig_tren = px.line(avg_hadir_minggu, x='minggu_tahun', y='Rata-rata Kehadiran (%)',
                             title='Tren Rata-rata Kehadiran Mentee Mingguan',
-                            labels={'minggu_tahun': 'Minggu', 'Rata-rata Kehadiran (%)': 'Rata-rata Kehadiran (%)'})
+                            labels={'minggu_tahun': 'Minggu (mulai Senin)', 'Rata-rata Kehadiran (%)': 'Rata-rata Kehadiran (%)'})
             fig_tren.update_traces(mode='markers+lines', marker_size=8, line_shape='spline')
             # Jika Anda menggunakan Streamlit, Anda akan menggunakan ini:
             st.plotly_chart(fig_tren, use_container_width=True)
@@ -162,36 +158,42 @@ if role == "Admin":
 
         st.subheader("📉 Tren Rata-rata Kehadiran Bulanan")
         if 'tanggal' in presensi_df_filtered.columns:
-            presensi_df_filtered['bulan_tahun'] = presensi_df_filtered['tanggal'].dt.to_period('M').astype(str)
-            avg_hadir_bulan = presensi_df_filtered.groupby('bulan_tahun')['hadir_hitung'].mean().reset_index()
-            avg_hadir_bulan['Rata-rata Kehadiran (%)'] = avg_hadir_bulan['hadir_hitung'] * 100
-            
-            # Urutkan berdasarkan bulan_tahun untuk plot yang benar
-            avg_hadir_bulan = avg_hadir_bulan.sort_values('bulan_tahun')
+            avg_hadir_bulan = attendance_trend('M', **filter_tanggal).rename(columns={'periode': 'bulan_tahun'})
 
             fig_tren = px.line(avg_hadir_bulan, x='bulan_tahun', y='Rata-rata Kehadiran (%)',
                                title='Tren Rata-rata Kehadiran Mentee Bulanan',
                                labels={'bulan_tahun': 'Bulan', 'Rata-rata Kehadiran (%)': 'Rata-rata Kehadiran (%)'})
             fig_tren.update_traces(mode='markers+lines', marker_size=8, line_shape='spline')
+            fig_tren.update_xaxes(tickformat='%b %Y')
             st.plotly_chart(fig_tren, use_container_width=True)
         else:
             st.info("Kolom 'tanggal' tidak tersedia untuk menampilkan tren kehadiran.")
 
+        st.subheader("📉 Tren Rata-rata Kehadiran per Semester")
+        if 'tanggal' in presensi_df_filtered.columns:
+            avg_hadir_semester = attendance_trend('S', **filter_tanggal)
+            avg_hadir_semester = avg_hadir_semester.assign(
+                semester=avg_hadir_semester['periode'].dt.year.astype(str) +
+                         avg_hadir_semester['periode'].dt.month.map({1: " (Jan-Jun)", 7: " (Jul-Des)"}))
+            fig_semester = px.bar(avg_hadir_semester, x='semester', y='Rata-rata Kehadiran (%)',
+                                  title='Rata-rata Kehadiran Mentee per Semester',
+                                  labels={'semester': 'Semester', 'Rata-rata Kehadiran (%)': 'Rata-rata Kehadiran (%)'},
+                                  text_auto='.1f')
+            fig_semester.update_traces(marker_color='#6495ED')
+            st.plotly_chart(fig_semester, use_container_width=True)
+        else:
+            st.info("Kolom 'tanggal' tidak tersedia untuk menampilkan tren kehadiran.")
+
         # --- Tabel Ringkasan Mentor Terbaik/Terendah (Admin) ---
         st.subheader("🏆 Performa Mentor Berdasarkan Rata-rata Kehadiran Kelompok")
         if not presensi_df_filtered.empty and not mentee_df.empty:
-            presensi_with_mentor = presensi_df_filtered.merge(mentee_df[['id', 'mentor_id']], left_on='mentee_id', right_on='id', suffixes=('', '_mentee_id_drop'))
-            presensi_with_mentor = presensi_with_mentor.merge(mentor_df[['id', 'nama']], left_on='mentor_id', right_on='id', suffixes=('', '_mentor_id_drop'))
-            
-            avg_hadir_per_mentor = presensi_with_mentor.groupby(['mentor_id', 'nama'])['hadir_hitung'].mean().reset_index()
-            avg_hadir_per_mentor['Rata-rata Kehadiran (%)'] = avg_hadir_per_mentor['hadir_hitung'] * 100
-            avg_hadir_per_mentor = avg_hadir_per_mentor.sort_values('Rata-rata Kehadiran (%)', ascending=False)
+            avg_hadir_per_mentor = mentor_ranking(**filter_tanggal)[['nama', 'Rata-rata Kehadiran (%)']]
 
             st.write("**Top 5 Mentor (Berdasarkan Rata-rata Kehadiran Kelompok):**")
-            st.dataframe(avg_hadir_per_mentor.head(5).drop(columns=['mentor_id', 'hadir_hitung']).rename(columns={'nama': 'Nama Mentor'}), use_container_width=True)
+            st.dataframe(avg_hadir_per_mentor.head(5).rename(columns={'nama': 'Nama Mentor'}), use_container_width=True)
             
             st.write("**5 Mentor Terendah (Berdasarkan Rata-rata Kehadiran Kelompok):**")
-            st.dataframe(avg_hadir_per_mentor.tail(5).drop(columns=['mentor_id', 'hadir_hitung']).rename(columns={'nama': 'Nama Mentor'}), use_container_width=True)
+            st.dataframe(avg_hadir_per_mentor.tail(5).rename(columns={'nama': 'Nama Mentor'}), use_container_width=True)
         else:
             st.info("Data tidak cukup untuk menampilkan performa mentor.")
 
@@ -205,16 +207,36 @@ if role == "Admin":
         with st.expander("Lihat Data Presensi Lengkap (Disaring oleh Tanggal)"):
             # Implementasi sederhana filter/pencarian di sini jika diperlukan
             search_query_admin = st.text_input("Cari di Presensi (Nama Mentee/Status):", key="search_admin")
-            presensi_display = presensi_df_filtered.merge(mentee_df[['id', 'nama']], left_on='mentee_id', right_on='id', suffixes=('', '_mentee'))
-            
             if search_query_admin:
-                presensi_display = presensi_display[
-                    presensi_display['nama'].str.contains(search_query_admin, case=False, na=False) |
-                    presensi_display['status_kehadiran'].str.contains(search_query_admin, case=False, na=False)
-                ]
-            
-            st.dataframe(presensi_display.drop(columns=['id_mentee']), use_container_width=True)
+                # Indeks pencarian (utils.search_index) mengembalikan posisi baris yang cocok dalam rentang tanggal
+                posisi_cocok = get_search_index().search(search_query_admin, *rentang_baris)
+                presensi_display = presensi_by_date.frame.iloc[posisi_cocok]
+            else:
+                presensi_display = presensi_df_filtered
+            # Nama mentee sudah ada di tabel fakta; presensi milik mentee yang sudah dihapus tidak ditampilkan
+            presensi_display = presensi_display[presensi_display['nama_mentee'].notna()].rename(columns={'nama_mentee': 'nama'})
+
+            # Hanya halaman yang terlihat yang dikirim ke browser
+            paginated_dataframe(presensi_display, key="presensi_admin", use_container_width=True)
             st.caption("Anda dapat mengetik di kotak pencarian di atas untuk memfilter tabel ini.")
+        with st.expander("📦 Arsip Presensi Mentah (Parquet/CSV)"):
+            # Arsip dibuat dari data yang sudah ada di cache (utils.export_utils), tanpa membaca ulang Google Sheets
+            st.caption("Berisi seluruh baris presensi beserta nama mentee, kelompok, dan mentor untuk arsip atau analisis offline.")
+            pakai_filter_tanggal = st.checkbox("Batasi sesuai rentang tanggal di sidebar", value=False, key="arsip_pakai_tanggal")
+            mentor_arsip = st.multiselect("Mentor (kosongkan untuk semua mentor):", mentor_df['nama'].tolist() if not mentor_df.empty else [], key="arsip_mentor")
+            format_arsip = st.radio("Format", list(ARCHIVE_FORMATS), format_func=str.upper, horizontal=True, key="arsip_format")
+
+            filter_arsip = dict(filter_tanggal) if pakai_filter_tanggal else {}
+            if mentor_arsip:
+                filter_arsip["mentor_ids"] = mentor_df[mentor_df['nama'].isin(mentor_arsip)]['id'].tolist()
+            kunci_arsip = (format_arsip, str(sorted(filter_arsip.items(), key=lambda item: item[0])))
+            if st.button("Siapkan Arsip", key="siapkan_arsip"):
+                st.session_state["arsip_siap"] = kunci_arsip
+            if st.session_state.get("arsip_siap") == kunci_arsip:
+                with st.spinner("Menyiapkan arsip..."):
+                    arsip = build_archive(format_arsip, **filter_arsip)
+                nama_file, mime_arsip = ARCHIVE_FORMATS[format_arsip]
+                st.download_button(f"📥 Unduh {nama_file}", data=arsip, file_name=nama_file, mime=mime_arsip)
 
     else:
         st.info("Belum ada data presensi atau kolom 'status_kehadiran' tidak ditemukan untuk menampilkan analisis.")
@@ -225,23 +247,23 @@ elif role == "Mentor":
     
     mentee_saya = mentee_df[mentee_df["mentor_id"] == mentor_id]
     
-    # Filter presensi_df_filtered untuk kelompok mentor ini
-    presensi_saya_filtered = presensi_df_filtered[presensi_df_filtered["mentee_id"].isin(mentee_saya["id"])]
+    # Filter presensi_df_filtered untuk kelompok mentor ini (baris untuk tabel detail, utils.analytics untuk grafik)
+    presensi_saya_filtered = presensi_df_filtered[presensi_df_filtered["mentor_id"] == mentor_id]
+    filter_saya = {**filter_tanggal, "mentor_ids": [mentor_id]}
+    avg_hadir_kelompok = attendance_by_meeting(**filter_saya)
 
     # Gunakan kolom untuk metrik
     col_mentor_metric1, col_mentor_metric2 = st.columns(2)
     with col_mentor_metric1:
         st.metric("Jumlah Mentee di Kelompok Anda", len(mentee_saya))
     with col_mentor_metric2:
-        jumlah_pertemuan_dilakukan = presensi_saya_filtered['pertemuan'].nunique()
+        jumlah_pertemuan_dilakukan = len(avg_hadir_kelompok)
         st.metric("Jumlah Pertemuan Dilakukan", jumlah_pertemuan_dilakukan)
     
     st.divider()
 
-    if not presensi_saya_filtered.empty and 'hadir_hitung' in presensi_saya_filtered.columns:
+    if not presensi_saya_filtered.empty and not avg_hadir_kelompok.empty:
         st.subheader("📈 Rata-rata Kehadiran Kelompok Anda per Pertemuan")
-        avg_hadir_kelompok = presensi_saya_filtered.groupby("pertemuan")["hadir_hitung"].mean().reset_index()
-        avg_hadir_kelompok['Rata-rata Kehadiran (%)'] = avg_hadir_kelompok['hadir_hitung'] * 100
         fig_kelompok_avg = px.bar(avg_hadir_kelompok, x="pertemuan", y="Rata-rata Kehadiran (%)",
                                   title="Rata-rata Kehadiran Kelompok Mentoring",
                                   labels={"pertemuan": "Pertemuan Ke-", "Rata-rata Kehadiran (%)": "Rata-rata Kehadiran (%)"},
@@ -253,8 +275,7 @@ elif role == "Mentor":
 
 
         st.subheader("📊 Distribusi Status Kehadiran Kelompok Anda")
-        status_counts_kelompok = presensi_saya_filtered['status_kehadiran'].value_counts().reset_index()
-        status_counts_kelompok.columns = ['Status', 'Jumlah']
+        status_counts_kelompok = status_distribution(**filter_saya)
         fig_pie_kelompok = px.pie(status_counts_kelompok, values='Jumlah', names='Status',
                                    title='Persentase Status Kehadiran Kelompok',
                                    color_discrete_sequence=px.colors.qualitative.Pastel)
@@ -263,8 +284,7 @@ elif role == "Mentor":
 
         st.divider()
         st.subheader("📋 Detail Presensi Kelompok Anda")
-        presensi_detail = presensi_saya_filtered.merge(mentee_saya[['id', 'nama']], left_on='mentee_id', right_on='id', suffixes=('', '_mentee'))
-        presensi_detail = presensi_detail[['tanggal', 'pertemuan', 'nama', 'status_kehadiran']]
+        presensi_detail = presensi_saya_filtered[['tanggal', 'pertemuan', 'nama_mentee', 'status_kehadiran']].rename(columns={'nama_mentee': 'nama'})
         
         # Terapkan pemformatan kondisional
         def highlight_status(s):
@@ -277,10 +297,15 @@ elif role == "Mentor":
             else:
                 return ''
 
-        st.dataframe(
-            presensi_detail.rename(columns={'nama': 'Nama Mentee', 'status_kehadiran': 'Status Kehadiran'})
-            .style.applymap(highlight_status, subset=['Status Kehadiran']),
-            use_container_width=True
+        def style_halaman(halaman):
+            # Pemformatan hanya untuk baris di halaman yang ditampilkan (Styler.map menggantikan applymap sejak pandas 2.1)
+            styler = halaman.style
+            apply_cells = styler.map if hasattr(styler, "map") else styler.applymap
+            return apply_cells(highlight_status, subset=['Status Kehadiran'])
+
+        paginated_dataframe(
+            presensi_detail.rename(columns={'nama': 'Nama Mentee', 'status_kehadiran': 'Status Kehadiran'}),
+            key="presensi_kelompok", format_page=style_halaman, use_container_width=True
         )
 
         st.subheader("👤 Kehadiran Mentee Individual")
@@ -313,14 +338,11 @@ elif role == "Mentor":
         if not presensi_saya_filtered.empty:
             # Hitung jumlah 'Alfa' per mentee
             absensi_counts = presensi_saya_filtered[presensi_saya_filtered['status_kehadiran'] == 'Alfa'] \
-                                .groupby('mentee_id')['status_kehadiran'].count().reset_index()
-            absensi_counts.columns = ['mentee_id', 'Jumlah Alfa']
+                                .groupby(['mentee_id', 'nama_mentee'], observed=True).size().reset_index(name='Jumlah Alfa')
             
             if not absensi_counts.empty:
-                # Gabungkan dengan nama mentee
-                absensi_counts = absensi_counts.merge(mentee_saya[['id', 'nama']], left_on='mentee_id', right_on='id', suffixes=('', '_mentee_name_drop'))
                 absensi_counts = absensi_counts.sort_values('Jumlah Alfa', ascending=False)
-                st.dataframe(absensi_counts[['nama', 'Jumlah Alfa']].rename(columns={'nama': 'Nama Mentee'}), use_container_width=True)
+                st.dataframe(absensi_counts[['nama_mentee', 'Jumlah Alfa']].rename(columns={'nama_mentee': 'Nama Mentee'}), use_container_width=True)
             else:
                 st.info("Semua mentee dalam kelompok Anda hadir sempurna!")
         else:
@@ -1,107 +1,79 @@
 # pages/2_Data_Mentor.py
 import streamlit as st
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from utils.sequence_utils import next_id
+from utils.data_loader import load_frame
+from utils.write_queue import enqueue_append, enqueue_update, enqueue_updates, enqueue_delete, enqueue_deletes
+from utils.grid_edit import diff_edits
+from utils.import_utils import import_rows, prepare_import, read_upload
+from utils.pagination import paginated_dataframe
 from utils.auth_utils import require_admin # Pastikan ini mengarahkan ke fungsi yang benar
 
 # --- Cek Login dan Role Admin ---
 require_admin()
 
-# --- Setup Google Sheets ---
-SCOPE = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-
-# Menggunakan st.cache_resource untuk koneksi gspread agar tidak menginisialisasi ulang
-@st.cache_resource
-def get_gspread_client():
-    try:
-        CREDS = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", SCOPE)
-        CLIENT = gspread.authorize(CREDS)
-        return CLIENT.open("Presensi Mentoring STT NF") # Ganti dengan nama spreadsheet Anda
-    except FileNotFoundError:
-        st.error("Error: File 'service_account.json' tidak ditemukan di direktori proyek. Pastikan file ada.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Terjadi kesalahan saat menginisialisasi koneksi Google Sheets: {e}. Pastikan kredensial service account benar dan Google Sheets API aktif.")
-        st.stop()
-
-SHEET = get_gspread_client()
-mentor_ws = SHEET.worksheet("mentor")
-
-# --- Fungsi (Menggunakan st.cache_data untuk data) ---
-@st.cache_data(ttl=60) # Cache data mentor selama 60 detik
+# --- Fungsi (Data dari loader bersama utils.data_loader yang sudah di-cache) ---
 def load_data():
     try:
-        df = pd.DataFrame(mentor_ws.get_all_records())
-        if 'id' in df.columns:
-            df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(0).astype(int)
-        return df
+        return load_frame("mentor")
     except Exception as e:
         st.error(f"Gagal memuat data mentor: {e}")
         return pd.DataFrame() # Kembalikan DataFrame kosong jika gagal
 
-def get_next_id():
-    try:
-        data = mentor_ws.get_all_values()
-        if len(data) > 1: # Periksa apakah ada baris data selain header
-            ids = [int(row[0]) for row in data[1:] if row[0].isdigit()]
-            return max(ids) + 1
-        return 1 # Jika tidak ada data atau hanya header, mulai dari 1
-    except Exception as e:
-        st.error(f"Gagal mendapatkan ID berikutnya: {e}")
-        return 1
-
+# Semua perubahan dikirim lewat antrian tulis (utils.write_queue): pengguna langsung mendapat
+# konfirmasi, lalu worker latar belakang menulis ke Google Sheets dan membersihkan cache.
 def tambah_mentor(nama, email):
     try:
-        next_id = get_next_id()
-        mentor_ws.append_row([next_id, nama, email])
-        st.cache_data.clear() # Hapus cache setelah perubahan
+        # ID diambil dari sequence bersama tanpa membaca seluruh sheet
+        enqueue_append("mentor", [[next_id("mentor"), nama, email]])
         return True
     except Exception as e:
         st.error(f"Gagal menambahkan mentor: {e}")
         return False
 
-# Fungsi untuk mendapatkan nomor baris fisik di sheet
-def get_physical_row_index(df_index):
-    # Baris pertama di sheet adalah header (indeks 0 di df)
-    # Jadi, jika df_index = 0 (baris pertama data di df), di sheet adalah baris 2
-    return df_index + 2
-
-def update_mentor(df_index, nama, email):
+def update_mentor(mentor_id, data_lama, nama, email):
     try:
-        physical_row = get_physical_row_index(df_index)
-        # Mengambil semua nilai di baris tersebut
-        current_row_values = mentor_ws.row_values(physical_row)
-        
-        # Asumsikan kolom id di A, nama di B, email di C
-        # Pastikan list cukup panjang sebelum mengakses indeks
-        if len(current_row_values) < 3: # Memastikan ada setidaknya kolom A, B, C
-            # Jika kolom belum ada, tambahkan placeholder atau tangani sesuai kebutuhan
-            current_row_values.extend([''] * (3 - len(current_row_values))) 
-
-        current_row_values[1] = nama # Kolom B (indeks 1)
-        current_row_values[2] = email # Kolom C (indeks 2)
-        
-        # Perbarui baris di Google Sheets
-        # Mengupdate seluruh baris dari kolom A
-        mentor_ws.update(f'A{physical_row}', [current_row_values])
-        st.cache_data.clear() # Hapus cache setelah perubahan
+        # Hanya sel yang berbeda dari `data_lama` yang dikirim; baris dicari berdasarkan ID
+        enqueue_update("mentor", mentor_id, {"nama": nama, "email": email}, previous=data_lama)
         return True
     except Exception as e:
         st.error(f"Gagal memperbarui mentor: {e}")
         return False
 
-def hapus_mentor(df_index):
+def hapus_mentor(mentor_id):
     try:
-        physical_row = get_physical_row_index(df_index)
-        # PASTIKAN physical_row adalah tipe int standar Python
-        mentor_ws.delete_rows(int(physical_row))
-        st.cache_data.clear() # Hapus cache setelah perubahan
+        enqueue_delete("mentor", mentor_id)
         return True
     except Exception as e:
         st.error(f"Gagal menghapus mentor: {e}")
         return False
 
+def impor_mentor(valid):
+    try:
+        # Semua baris ditulis dengan satu append dan satu blok ID berurutan
+        return import_rows("mentor", valid)
+    except Exception as e:
+        st.error(f"Gagal mengimpor mentor: {e}")
+        return 0
+
+def simpan_edit_massal_mentor(data_asli, data_edit):
+    """Mengirim semua sel yang berubah di mode tabel sebagai satu job. Mengembalikan (jumlah baris, ID dilewati)."""
+    try:
+        perubahan, kosong = diff_edits(data_asli, data_edit, ["nama", "email"])
+        enqueue_updates("mentor", perubahan)
+        return len(perubahan), kosong
+    except Exception as e:
+        st.error(f"Gagal menyimpan perubahan tabel mentor: {e}")
+        return None, []
+
+def hapus_banyak_mentor(ids):
+    try:
+        # Semua baris dihapus dalam satu batch_update (deret baris bersebelahan digabung)
+        return enqueue_deletes("mentor", ids)
+    except Exception as e:
+        st.error(f"Gagal menghapus mentor: {e}")
+        return False
+
 # --- UI Halaman Utama ---
 st.title("👨‍🏫 Manajemen Data Mentor")
 st.markdown("Halaman ini memungkinkan Anda untuk menambah, melihat, mengedit, dan menghapus data mentor.")
@@ -115,8 +87,8 @@ st.subheader("Daftar Mentor Aktif")
 if data.empty:
     st.info("Tidak ada data mentor yang tersedia.")
 else:
-    # Optimasi tampilan dataframe
-    st.dataframe(data.set_index('id'), use_container_width=True, hide_index=False)
+    # Tabel berhalaman: hanya halaman yang terlihat yang dikirim ke browser
+    paginated_dataframe(data, key="daftar_mentor", use_container_width=True, hide_index=True)
 
 st.divider()
 
@@ -148,6 +120,86 @@ with st.form("form_tambah", clear_on_submit=True): # clear_on_submit untuk mengo
 
 st.divider()
 
+# --- Edit Massal (Mode Tabel) ---
+st.subheader("🧮 Edit Massal Mentor")
+if not data.empty:
+    # Tabel editor berisi seluruh data; baru dibangun setelah mode edit diaktifkan
+    if st.checkbox("Edit langsung di tabel", key="show_grid_mentor"):
+        st.caption("Ubah nama/email langsung di sel lalu simpan. Hanya sel yang berubah yang dikirim, semuanya dalam satu permintaan ke Google Sheets.")
+        if 'grid_mentor_key' not in st.session_state:
+            st.session_state.grid_mentor_key = 0
+        mentor_edit = st.data_editor(
+            data[['id', 'nama', 'email']],
+            disabled=['id'],
+            hide_index=True,
+            num_rows="fixed",
+            use_container_width=True,
+            key=f"grid_mentor_{st.session_state.grid_mentor_key}",
+        )
+        if st.button("💾 Simpan Perubahan Tabel", key="save_grid_mentor", type="primary"):
+            jumlah_edit, dilewati = simpan_edit_massal_mentor(data, mentor_edit)
+            if dilewati:
+                st.warning(f"Baris dengan ID {', '.join(map(str, dilewati))} dilewati karena ada kolom yang dikosongkan.")
+            if jumlah_edit == 0 and not dilewati:
+                st.info("Tidak ada perubahan untuk disimpan.")
+            elif jumlah_edit:
+                st.success(f"Perubahan pada {jumlah_edit} mentor berhasil disimpan.")
+                if not dilewati:
+                    st.session_state.grid_mentor_key += 1 # Mulai ulang tabel dari data terbaru
+                    st.rerun()
+
+st.divider()
+
+# --- Impor Massal Mentor (CSV/Excel) ---
+st.subheader("📥 Impor Massal Mentor")
+with st.expander("Impor dari file CSV/Excel"):
+    st.caption("Kolom wajib: nama, email. Email yang sudah terdaftar atau ganda di dalam file dilewati.")
+    # Key uploader diganti setelah impor agar file yang sama tidak terimpor dua kali
+    if 'import_mentor_key' not in st.session_state:
+        st.session_state.import_mentor_key = 0
+    file_impor = st.file_uploader("Pilih file", type=["csv", "xlsx"], key=f"import_mentor_file_{st.session_state.import_mentor_key}")
+    if file_impor is not None:
+        try:
+            valid_impor, ditolak_impor = prepare_import("mentor", read_upload(file_impor), data)
+        except Exception as e:
+            st.error(f"Gagal membaca file: {e}")
+        else:
+            st.write(f"**{len(valid_impor)}** baris siap diimpor, **{len(ditolak_impor)}** baris ditolak.")
+            if not ditolak_impor.empty:
+                st.dataframe(ditolak_impor, use_container_width=True)
+            if not valid_impor.empty and st.button(f"📥 Impor {len(valid_impor)} Mentor", key="do_import_mentor", type="primary"):
+                jumlah_impor = impor_mentor(valid_impor)
+                if jumlah_impor:
+                    st.session_state.import_mentor_key += 1
+                    st.success(f"{jumlah_impor} mentor berhasil diimpor.")
+                    st.rerun()
+
+st.divider()
+
+# --- Hapus Banyak Mentor ---
+st.subheader("🗑️ Hapus Banyak Mentor")
+if not data.empty:
+    # Daftar pilihan berisi seluruh mentor; baru dibangun setelah mode hapus diaktifkan
+    if st.checkbox("Pilih beberapa mentor untuk dihapus", key="show_bulk_delete_mentor"):
+        if 'bulk_delete_mentor_key' not in st.session_state:
+            st.session_state.bulk_delete_mentor_key = 0
+        nama_mentor = dict(zip(data['id'].tolist(), data['nama']))
+        ids_hapus = st.multiselect(
+            "Mentor yang akan dihapus:",
+            options=list(nama_mentor.keys()),
+            format_func=lambda x: f"{nama_mentor[x]} (ID: {x})",
+            key=f"bulk_delete_mentor_{st.session_state.bulk_delete_mentor_key}",
+        )
+        if ids_hapus:
+            konfirmasi = st.checkbox(f"Saya yakin ingin menghapus {len(ids_hapus)} mentor. Tindakan ini tidak dapat dibatalkan.", key="confirm_bulk_delete_mentor")
+            if st.button(f"🗑️ Hapus {len(ids_hapus)} Mentor", key="do_bulk_delete_mentor", type="primary", disabled=not konfirmasi):
+                if hapus_banyak_mentor(ids_hapus):
+                    st.session_state.bulk_delete_mentor_key += 1
+                    st.success(f"{len(ids_hapus)} mentor berhasil dihapus.")
+                    st.rerun()
+
+st.divider()
+
 # --- Bagian Edit / Hapus Mentor ---
 st.subheader("✏️ Edit atau Hapus Mentor")
 if not data.empty:
@@ -162,8 +214,8 @@ if not data.empty:
     
     # Ambil baris yang dipilih dari DataFrame yang dimuat
     selected_row_data = data[data['id'] == selected_id].iloc[0]
-    # 'df_idx_for_update_delete' adalah index baris DataFrame pandas
-    df_idx_for_update_delete = selected_row_data.name 
+    # Perubahan dirujuk berdasarkan ID mentor, bukan posisi baris DataFrame
+    selected_mentor_id = int(selected_row_data['id'])
 
     st.markdown(f"**Anda memilih:** {selected_row_data['nama']} (ID: {selected_row_data['id']})")
 
@@ -178,7 +230,7 @@ if not data.empty:
             if not nama_edit or not email_edit:
                 st.warning("Nama dan Email tidak boleh kosong.")
             else:
-                if update_mentor(df_idx_for_update_delete, nama_edit, email_edit):
+                if update_mentor(selected_mentor_id, selected_row_data, nama_edit, email_edit):
                     st.success(f"Data mentor '{nama_edit}' berhasil diperbarui.")
                     st.rerun()
                 else:
@@ -206,7 +258,7 @@ if not data.empty:
         with col_confirm_del1:
             # Ini juga st.button() biasa
             if st.button("✅ Ya, Hapus Sekarang!", key="confirm_delete_yes_final"):
-                if hapus_mentor(df_idx_for_update_delete):
+                if hapus_mentor(selected_mentor_id):
                     st.success("Mentor berhasil dihapus.")
                     st.session_state.delete_confirm = False # Reset state
                     st.rerun()
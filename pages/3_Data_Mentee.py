@@ -1,122 +1,88 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from utils.sequence_utils import next_id
+from utils.data_loader import load_frame
+from utils.write_queue import enqueue_append, enqueue_update, enqueue_updates, enqueue_delete, enqueue_deletes
+from utils.grid_edit import diff_edits
+from utils.import_utils import import_rows, prepare_import, read_upload
+from utils.pagination import paginated_dataframe
 from utils.auth_utils import require_admin, require_login # Pastikan ini mengarah ke fungsi yang benar
 
 # --- Cek Login dan Role Admin ---
 # Hanya admin yang bisa mengelola data mentee secara penuh (CRUD)
 require_admin() 
 
-# --- Setup Google Sheets ---
-SCOPE = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-
-# Menggunakan st.cache_resource untuk koneksi gspread agar tidak menginisialisasi ulang
-@st.cache_resource
-def get_gspread_client():
-    try:
-        CREDS = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", SCOPE)
-        CLIENT = gspread.authorize(CREDS)
-        return CLIENT.open("Presensi Mentoring STT NF") # Ganti dengan nama spreadsheet Anda
-    except FileNotFoundError:
-        st.error("Error: File 'service_account.json' tidak ditemukan di direktori proyek. Pastikan file ada.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Terjadi kesalahan saat menginisialisasi koneksi Google Sheets: {e}. Pastikan kredensial service account benar dan Google Sheets API aktif.")
-        st.stop()
-
-SHEET = get_gspread_client()
-mentee_ws = SHEET.worksheet("mentee")
-mentor_ws = SHEET.worksheet("mentor") # Perlu akses ke sheet mentor untuk dropdown mentor
-
-# --- Fungsi (Menggunakan st.cache_data untuk data) ---
-@st.cache_data(ttl=60) # Cache data mentee selama 60 detik
+# --- Fungsi (Data dari loader bersama utils.data_loader yang sudah di-cache) ---
 def load_mentee_data():
     try:
-        df = pd.DataFrame(mentee_ws.get_all_records())
-        if 'id' in df.columns:
-            df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(0).astype(int)
-        if 'mentor_id' in df.columns:
-            df['mentor_id'] = pd.to_numeric(df['mentor_id'], errors='coerce').fillna(0).astype(int)
-        return df
+        return load_frame("mentee")
     except Exception as e:
         st.error(f"Gagal memuat data mentee: {e}")
         return pd.DataFrame() # Kembalikan DataFrame kosong jika gagal
 
-@st.cache_data(ttl=60) # Cache data mentor map selama 60 detik
 def load_mentor_map():
     try:
-        df = pd.DataFrame(mentor_ws.get_all_records())
-        df['id'] = pd.to_numeric(df['id'], errors='coerce').fillna(0).astype(int)
-        return dict(zip(df['id'], df['nama']))
+        df = load_frame("mentor")
+        return dict(zip(df['id'].tolist(), df['nama']))
     except Exception as e:
         st.error(f"Gagal memuat data mentor untuk peta: {e}")
         return {}
 
 
-def get_next_mentee_id():
-    try:
-        data = mentee_ws.get_all_values()
-        if len(data) > 1: # Periksa apakah ada baris data selain header
-            # Mengambil ID dari kolom pertama, mengabaikan yang kosong atau non-digit
-            ids = [int(row[0]) for row in data[1:] if row and row[0] and str(row[0]).isdigit()]
-            if ids:
-                return max(ids) + 1
-        return 1 # Jika tidak ada data atau hanya header, mulai dari 1
-    except Exception as e:
-        st.error(f"Gagal mendapatkan ID mentee berikutnya: {e}")
-        return 1
-
+# Semua perubahan dikirim lewat antrian tulis (utils.write_queue): pengguna langsung mendapat
+# konfirmasi, lalu worker latar belakang menulis ke Google Sheets dan membersihkan cache.
 def tambah_mentee(nama, kelompok, mentor_id):
     try:
-        next_id = get_next_mentee_id()
-        mentee_ws.append_row([next_id, nama, kelompok, int(mentor_id)])
-        load_mentee_data.clear() # Hapus cache setelah perubahan
+        # ID diambil dari sequence bersama tanpa membaca seluruh sheet
+        enqueue_append("mentee", [[next_id("mentee"), nama, kelompok, int(mentor_id)]])
         return True
     except Exception as e:
         st.error(f"Gagal menambahkan mentee: {e}")
         return False
 
-# Fungsi untuk mendapatkan nomor baris fisik di sheet (untuk mentee)
-def get_mentee_physical_row_index(df_index):
-    # Baris pertama di sheet adalah header (indeks 0 di df)
-    # Jadi, jika df_index = 0 (baris pertama data di df), di sheet adalah baris 2
-    return df_index + 2
-
-def update_mentee(df_index, nama, kelompok, mentor_id):
+def update_mentee(mentee_id, data_lama, nama, kelompok, mentor_id):
     try:
-        physical_row = get_mentee_physical_row_index(df_index)
-        
-        # Ambil seluruh baris yang ada untuk memastikan ID tidak berubah
-        current_row_values = mentee_ws.row_values(physical_row)
-
-        # Pastikan list cukup panjang sebelum mengakses indeks
-        # ID (kolom A - indeks 0), Nama (B - indeks 1), Kelompok (C - indeks 2), Mentor_ID (D - indeks 3)
-        if len(current_row_values) < 4: 
-            current_row_values.extend([''] * (4 - len(current_row_values))) 
-
-        current_row_values[1] = nama       # Kolom B (nama)
-        current_row_values[2] = kelompok   # Kolom C (kelompok)
-        current_row_values[3] = int(mentor_id) # Kolom D (mentor_id)
-        
-        # Perbarui seluruh baris di Google Sheets
-        mentee_ws.update(f'A{physical_row}', [current_row_values])
-        load_mentee_data.clear() # Hapus cache setelah perubahan
+        # Hanya sel yang berbeda dari `data_lama` yang dikirim; baris dicari berdasarkan ID
+        enqueue_update("mentee", mentee_id, {"nama": nama, "kelompok": kelompok, "mentor_id": int(mentor_id)}, previous=data_lama)
         return True
     except Exception as e:
         st.error(f"Gagal memperbarui mentee: {e}")
         return False
 
-def hapus_mentee(df_index):
+def hapus_mentee(mentee_id):
     try:
-        physical_row = get_mentee_physical_row_index(df_index)
-        mentee_ws.delete_rows(int(physical_row))
-        load_mentee_data.clear() # Hapus cache setelah perubahan
+        enqueue_delete("mentee", mentee_id)
         return True
     except Exception as e:
         st.error(f"Gagal menghapus mentee: {e}")
         return False
 
+def impor_mentee(valid):
+    try:
+        # Semua baris ditulis dengan satu append dan satu blok ID berurutan
+        return import_rows("mentee", valid)
+    except Exception as e:
+        st.error(f"Gagal mengimpor mentee: {e}")
+        return 0
+
+def simpan_edit_massal_mentee(data_asli, data_edit):
+    """Mengirim semua sel yang berubah di mode tabel sebagai satu job. Mengembalikan (jumlah baris, ID dilewati)."""
+    try:
+        perubahan, kosong = diff_edits(data_asli, data_edit, ["nama", "kelompok", "mentor_id"])
+        enqueue_updates("mentee", perubahan)
+        return len(perubahan), kosong
+    except Exception as e:
+        st.error(f"Gagal menyimpan perubahan tabel mentee: {e}")
+        return None, []
+
+def hapus_banyak_mentee(ids):
+    try:
+        # Semua baris dihapus dalam satu batch_update (deret baris bersebelahan digabung)
+        return enqueue_deletes("mentee", ids)
+    except Exception as e:
+        st.error(f"Gagal menghapus mentee: {e}")
+        return False
+
 # --- UI Halaman Utama ---
 st.title("🧑‍🎓 Manajemen Data Mentee")
 st.markdown("Halaman ini memungkinkan Anda untuk menambah, melihat, mengedit, dan menghapus data mentee.")
@@ -132,9 +98,13 @@ st.subheader("Daftar Mentee Aktif")
 if mentee_data.empty:
     st.info("Tidak ada data mentee yang tersedia.")
 else:
-    # Gabungkan nama mentor ke dalam DataFrame untuk tampilan yang lebih baik
-    mentee_data['Nama Mentor'] = mentee_data['mentor_id'].map(mentor_map).fillna('Tidak Ditemukan')
-    st.dataframe(mentee_data[['id', 'nama', 'kelompok', 'Nama Mentor']].set_index('id'), use_container_width=True, hide_index=False)
+    # Nama mentor digabungkan hanya untuk baris di halaman yang ditampilkan
+    # (pakai assign: DataFrame dari loader dipakai bersama dan tidak boleh diubah in-place)
+    def tampilan_mentee(halaman):
+        halaman = halaman.assign(**{'Nama Mentor': halaman['mentor_id'].map(mentor_map).fillna('Tidak Ditemukan')})
+        return halaman[['id', 'nama', 'kelompok', 'Nama Mentor']]
+
+    paginated_dataframe(mentee_data, key="daftar_mentee", format_page=tampilan_mentee, use_container_width=True, hide_index=True)
 
 st.divider()
 
@@ -176,6 +146,94 @@ with st.form("form_tambah_mentee", clear_on_submit=True):
 
 st.divider()
 
+# --- Edit Massal (Mode Tabel) ---
+st.subheader("🧮 Edit Massal Mentee")
+if not mentee_data.empty:
+    # Tabel editor berisi seluruh data; baru dibangun setelah mode edit diaktifkan
+    if st.checkbox("Edit langsung di tabel", key="show_grid_mentee"):
+        st.caption("Ubah nama, kelompok, atau mentor langsung di sel lalu simpan. Hanya sel yang berubah yang dikirim, semuanya dalam satu permintaan ke Google Sheets.")
+        if 'grid_mentee_key' not in st.session_state:
+            st.session_state.grid_mentee_key = 0
+        mentee_edit = st.data_editor(
+            mentee_data[['id', 'nama', 'kelompok', 'mentor_id']],
+            disabled=['id'],
+            hide_index=True,
+            num_rows="fixed",
+            use_container_width=True,
+            column_config={
+                "mentor_id": st.column_config.SelectboxColumn(
+                    "mentor_id",
+                    options=list(mentor_map.keys()),
+                    required=True,
+                    help=", ".join(f"{mid} = {nama}" for mid, nama in mentor_map.items()),
+                ),
+            },
+            key=f"grid_mentee_{st.session_state.grid_mentee_key}",
+        )
+        if st.button("💾 Simpan Perubahan Tabel", key="save_grid_mentee", type="primary"):
+            jumlah_edit, dilewati = simpan_edit_massal_mentee(mentee_data, mentee_edit)
+            if dilewati:
+                st.warning(f"Baris dengan ID {', '.join(map(str, dilewati))} dilewati karena ada kolom yang dikosongkan.")
+            if jumlah_edit == 0 and not dilewati:
+                st.info("Tidak ada perubahan untuk disimpan.")
+            elif jumlah_edit:
+                st.success(f"Perubahan pada {jumlah_edit} mentee berhasil disimpan.")
+                if not dilewati:
+                    st.session_state.grid_mentee_key += 1 # Mulai ulang tabel dari data terbaru
+                    st.rerun()
+
+st.divider()
+
+# --- Impor Massal Mentee (CSV/Excel) ---
+st.subheader("📥 Impor Massal Mentee")
+with st.expander("Impor dari file CSV/Excel"):
+    st.caption("Kolom wajib: nama, kelompok, mentor_id. mentor_id harus terdaftar di Data Mentor; nama yang sudah terdaftar atau ganda di dalam file dilewati.")
+    # Key uploader diganti setelah impor agar file yang sama tidak terimpor dua kali
+    if 'import_mentee_key' not in st.session_state:
+        st.session_state.import_mentee_key = 0
+    file_impor = st.file_uploader("Pilih file", type=["csv", "xlsx"], key=f"import_mentee_file_{st.session_state.import_mentee_key}")
+    if file_impor is not None:
+        try:
+            valid_impor, ditolak_impor = prepare_import("mentee", read_upload(file_impor), mentee_data, mentor_map.keys())
+        except Exception as e:
+            st.error(f"Gagal membaca file: {e}")
+        else:
+            st.write(f"**{len(valid_impor)}** baris siap diimpor, **{len(ditolak_impor)}** baris ditolak.")
+            if not ditolak_impor.empty:
+                st.dataframe(ditolak_impor, use_container_width=True)
+            if not valid_impor.empty and st.button(f"📥 Impor {len(valid_impor)} Mentee", key="do_import_mentee", type="primary"):
+                jumlah_impor = impor_mentee(valid_impor)
+                if jumlah_impor:
+                    st.session_state.import_mentee_key += 1
+                    st.success(f"{jumlah_impor} mentee berhasil diimpor.")
+                    st.rerun()
+
+st.divider()
+
+# --- Hapus Banyak Mentee ---
+st.subheader("🗑️ Hapus Banyak Mentee")
+if not mentee_data.empty:
+    # Daftar pilihan berisi seluruh mentee; baru dibangun setelah mode hapus diaktifkan
+    if st.checkbox("Pilih beberapa mentee untuk dihapus", key="show_bulk_delete_mentee"):
+        if 'bulk_delete_mentee_key' not in st.session_state:
+            st.session_state.bulk_delete_mentee_key = 0
+        nama_mentee = dict(zip(mentee_data['id'].tolist(), mentee_data['nama']))
+        ids_hapus = st.multiselect(
+            "Mentee yang akan dihapus:",
+            options=list(nama_mentee.keys()),
+            format_func=lambda x: f"{nama_mentee[x]} (ID: {x})",
+            key=f"bulk_delete_mentee_{st.session_state.bulk_delete_mentee_key}",
+        )
+        if ids_hapus:
+            konfirmasi = st.checkbox(f"Saya yakin ingin menghapus {len(ids_hapus)} mentee. Tindakan ini tidak dapat dibatalkan.", key="confirm_bulk_delete_mentee")
+            if st.button(f"🗑️ Hapus {len(ids_hapus)} Mentee", key="do_bulk_delete_mentee", type="primary", disabled=not konfirmasi):
+                if hapus_banyak_mentee(ids_hapus):
+                    st.session_state.bulk_delete_mentee_key += 1
+                    st.success(f"{len(ids_hapus)} mentee berhasil dihapus.")
+                    st.rerun()
+
+st.divider()
+
 # --- Bagian Edit / Hapus Mentee ---
 st.subheader("✏️ Edit atau Hapus Mentee")
 if not mentee_data.empty:
@@ -190,8 +248,8 @@ if not mentee_data.empty:
     
     # Ambil baris yang dipilih dari DataFrame yang dimuat
     selected_row_data = mentee_data[mentee_data['id'] == selected_id].iloc[0]
-    # 'df_idx_for_update_delete' adalah index baris DataFrame pandas
-    df_idx_for_update_delete = selected_row_data.name 
+    # Perubahan dirujuk berdasarkan ID mentee, bukan posisi baris DataFrame
+    selected_mentee_id = int(selected_row_data['id'])
 
     st.markdown(f"**Anda memilih:** {selected_row_data['nama']} (ID: {selected_row_data['id']})")
 
@@ -220,7 +278,7 @@ if not mentee_data.empty:
             if not nama_edit or not kelompok_edit or selected_mentor_id_edit is None:
                 st.warning("Nama, Kelompok, dan Mentor tidak boleh kosong.")
             else:
-                if update_mentee(df_idx_for_update_delete, nama_edit, kelompok_edit, selected_mentor_id_edit):
+                if update_mentee(selected_mentee_id, selected_row_data, nama_edit, kelompok_edit, selected_mentor_id_edit):
                     st.success(f"Data mentee '{nama_edit}' berhasil diperbarui.")
                     st.rerun()
                 else:
@@ -242,7 +300,7 @@ if not mentee_data.empty:
         col_confirm_del1, col_confirm_del2 = st.columns(2)
         with col_confirm_del1:
             if st.button("✅ Ya, Hapus Sekarang!", key="confirm_delete_mentee_yes_final"):
-                if hapus_mentee(df_idx_for_update_delete):
+                if hapus_mentee(selected_mentee_id):
                     st.success("Mentee berhasil dihapus.")
                     st.session_state.delete_mentee_confirm = False 
                     st.rerun()
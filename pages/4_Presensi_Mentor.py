@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
-import gspread
 from datetime import datetime
-from oauth2client.service_account import ServiceAccountCredentials
 from utils.auth_utils import require_mentor # Pastikan require_mentor tersedia
+from utils.sequence_utils import allocate_ids
+from utils.data_loader import load_frame
+from utils.sheets_utils import SERVICE_ACCOUNT_FILE
+from utils.write_queue import enqueue_append
+from utils.rate_limiter import PRIORITY_INTERACTIVE, request_priority
 
 # --- Cek Login dan Role ---
 require_mentor()
@@ -21,62 +23,70 @@ def show_logout_button():
 # Panggil fungsi logout agar muncul di sidebar
 show_logout_button()
 
-# --- Setup Google Sheets ---
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-try:
-    CREDS = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", SCOPE)
-    CLIENT = gspread.authorize(CREDS)
-    SHEET = CLIENT.open("Presensi Mentoring STT NF")
-    mentee_ws = SHEET.worksheet("mentee")
-    presensi_ws = SHEET.worksheet("presensi")
-except Exception as e:
-    st.error(f"Gagal membuka Google Sheets: {e}")
-    st.stop()
-
-# --- Load Data Mentee (dengan caching untuk performa) ---
-@st.cache_data(ttl=300) # Cache data selama 5 menit
+# --- Load Data Mentee ---
 def load_mentees(current_mentor_id):
     """
     Memuat data mentee yang terkait dengan mentor yang sedang login.
+    Disaring dari DataFrame mentee bersama (utils.data_loader), sehingga worksheet mentee tetap
+    dibaca sekali untuk semua mentor dan ikut diperbarui begitu versinya naik.
     """
-    df = pd.DataFrame(mentee_ws.get_all_records())
-    
-    # Konversi kolom 'id' dan 'mentor_id' ke numerik, tangani error dan NaN
-    for col in ['id', 'mentor_id']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-    
-    # Filter mentee berdasarkan mentor_id yang sedang login
-    return df[df['mentor_id'] == current_mentor_id]
+    df = load_frame("mentee")
+    if "mentor_id" not in df.columns:
+        return df.iloc[0:0]
+    return df[df["mentor_id"] == current_mentor_id]
 
 # --- Simpan Presensi ---
-def simpan_presensi(mentee_id, tanggal, pertemuan, status_kehadiran):
+def simpan_presensi_batch(kehadiran, tanggal, pertemuan):
     """
-    Menyimpan catatan presensi ke Google Sheet.
+    Menyimpan presensi satu kelompok sekaligus ke antrian tulis Google Sheet.
+    ID dialokasikan sebagai satu blok berurutan dan semua baris ditulis dengan satu append_rows.
+    Mengembalikan dict {mentee_id: True/False} untuk setiap mentee.
     """
+    hasil = {}
+    rows = []
+    row_mentee_ids = [] # mentee_id asli untuk setiap baris di `rows`
+    for mentee_id, status_kehadiran in kehadiran.items():
+        try:
+            # Urutan kolom: ID (diisi di bawah), mentee_id, tanggal, pertemuan, status_kehadiran
+            rows.append([None, int(mentee_id), tanggal, int(pertemuan), status_kehadiran])
+            row_mentee_ids.append(mentee_id)
+        except (TypeError, ValueError) as e:
+            st.error(f"Data presensi mentee ID {mentee_id} tidak valid: {e}")
+            hasil[mentee_id] = False
+
+    if not rows:
+        return hasil
+
     try:
-        rows = presensi_ws.get_all_values()
-        next_id = 1
-        if len(rows) > 1: # Jika ada baris selain header
-            # Ambil semua ID dari kolom pertama (indeks 0) dan filter yang valid
-            # Pastikan row[0] tidak kosong sebelum str.isdigit()
-            ids = [int(row[0]) for row in rows[1:] if len(row) > 0 and row[0] and str(row[0]).isdigit()]
-            if ids: # Pastikan ada ID yang berhasil diambil
-                next_id = max(ids) + 1
-        
-        # Urutan kolom: ID (otomatis), mentee_id, tanggal, pertemuan, status_kehadiran
-        presensi_ws.append_row([next_id, int(mentee_id), tanggal, int(pertemuan), status_kehadiran])
-        return True
+        # Satu blok ID berurutan untuk seluruh kelompok, dialokasikan dari sequence bersama
+        for row, new_id in zip(rows, allocate_ids("presensi", len(rows))):
+            row[0] = new_id
+        # Satu entri antrian untuk seluruh kelompok; worker mengirimnya dengan satu append_rows
+        enqueue_append("presensi", rows)
+        berhasil = True
     except Exception as e:
-        st.error(f"Gagal menyimpan presensi mentee ID {mentee_id}: {e}")
-        return False
+        st.error(f"Gagal menyimpan presensi kelompok: {e}")
+        berhasil = False
+
+    for mentee_id in row_mentee_ids:
+        hasil[mentee_id] = berhasil
+    return hasil
 
 # --- UI Halaman Presensi ---
 st.title("📝 Form Presensi Mentee")
 st.info(f"Anda login sebagai Mentor (ID: **{mentor_id}**)")
 
 # Muat data mentee untuk mentor ini (akan menggunakan cache)
-mentees = load_mentees(mentor_id)
+# Form presensi didahulukan di atas pembacaan dashboard saat kuota API sedang padat
+try:
+    with request_priority(PRIORITY_INTERACTIVE):
+        mentees = load_mentees(mentor_id)
+except FileNotFoundError:
+    st.error(f"Error: File '{SERVICE_ACCOUNT_FILE}' tidak ditemukan di direktori proyek. Pastikan file ada.")
+    st.stop()
+except Exception as e:
+    st.error(f"Terjadi kesalahan saat memuat data mentee dari Google Sheets: {e}. Pastikan kredensial service account benar dan Google Sheets API aktif.")
+    st.stop()
 
 if mentees.empty:
     st.warning("Belum ada mentee dalam kelompok Anda. Silakan tambahkan mentee di halaman Manajemen Data Mentee.")
@@ -123,13 +133,14 @@ if st.button("💾 Simpan Presensi", use_container_width=True):
         fail_count = 0
         failed_mentees_info = []
 
-        for mentee_id, status_kehadiran in kehadiran_dict.items():
-            # Dapatkan nama mentee untuk feedback yang lebih baik
-            mentee_nama_for_feedback = mentees[mentees['id'] == mentee_id]['nama'].iloc[0] if not mentees[mentees['id'] == mentee_id].empty else f"ID {mentee_id}"
-            
-            if simpan_presensi(mentee_id, tanggal.strftime("%Y-%m-%d"), pertemuan, status_kehadiran):
+        hasil_simpan = simpan_presensi_batch(kehadiran_dict, tanggal.strftime("%Y-%m-%d"), pertemuan)
+
+        for mentee_id, berhasil in hasil_simpan.items():
+            if berhasil:
                 success_count += 1
             else:
+                # Dapatkan nama mentee untuk feedback yang lebih baik
+                mentee_nama_for_feedback = mentees[mentees['id'] == mentee_id]['nama'].iloc[0] if not mentees[mentees['id'] == mentee_id].empty else f"ID {mentee_id}"
                 fail_count += 1
                 failed_mentees_info.append(mentee_nama_for_feedback)
 
@@ -139,5 +150,5 @@ if st.button("💾 Simpan Presensi", use_container_width=True):
             st.error(f"❌ Gagal menyimpan presensi untuk **{fail_count}** mentee: {', '.join(failed_mentees_info)}.")
         
         # Selalu rerun setelah submit untuk membersihkan form dan update UI
-        # Ini akan memaksa load_mentees() dari cache jika TTL belum habis, atau dari sheet jika sudah habis.
+        # Data presensi di dashboard/statistik diperbarui begitu antrian mengirimkannya (versi worksheet naik).
         st.rerun()
\ No newline at end of file
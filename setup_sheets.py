@@ -3,6 +3,7 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
 import time
+from utils.schema import SCHEMAS
 
 # --- Konfigurasi ---
 SPREADSHEET_NAME = "Presensi Mentoring STT NF" # Ganti dengan nama spreadsheet Anda
@@ -29,12 +30,8 @@ try:
         print(f"**PENTING: Mohon bagikan spreadsheet ini dengan email Service Account Anda '{CREDS.client_email}' dan berikan izin 'Editor'.**")
         input("Tekan Enter setelah Anda membagikan spreadsheet dan menekan izin. (Mungkin perlu beberapa detik untuk propagate)")
 
-    # Periksa dan buat/reset worksheet
-    worksheets_to_create = {
-        "mentor": ["id", "nama", "email"],
-        "mentee": ["id", "nama", "kelompok", "mentor_id"],
-        "presensi": ["id", "mentee_id", "mentor_id", "nama_mentor", "tanggal", "pertemuan", "hadir"]
-    }
+    # Periksa dan buat/reset worksheet (header mengikuti skema pusat di utils/schema.py)
+    worksheets_to_create = {name: list(columns) for name, columns in SCHEMAS.items()}
 
     for ws_name, headers in worksheets_to_create.items():
         try:
@@ -0,0 +1,183 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import frame_generation
+from utils.fact_table import get_facts
+from utils.schema import STATUS_KEHADIRAN
+
+# Agregat kehadiran yang dirawat bertahap (materialized view) di atas tabel fakta presensi
+# (utils.fact_table), yang sudah membawa mentor_id setiap baris.
+# - `cube`   : jumlah per (tanggal, pertemuan, mentor_id) x status, plus kolom `total`
+#              (semua baris, termasuk status kosong). Cukup untuk rata-rata per pertemuan,
+#              distribusi status, tren mingguan/bulanan, dan peringkat mentor pada rentang tanggal apa pun.
+# - `mentee` : MenteeCounter, matriks NumPy jumlah per mentee x status (seluruh waktu) plus
+#              pertemuan yang pernah tercatat per mentee, untuk rekap per mentee.
+# Saat presensi bertambah, hanya baris baru yang diagregasi lalu dijumlahkan ke agregat lama.
+# Agregat dibangun ulang penuh setiap kali tabel fakta dibangun ulang (frame_generation berubah:
+# presensi dimuat ulang penuh, mis. ada baris yang diubah/dihapus, atau data mentee/mentor berubah).
+# Halaman membaca agregat dalam O(jumlah grup), tidak bergantung pada jumlah baris presensi.
+
+CUBE_KEYS = ["tanggal", "pertemuan", "mentor_id"]
+COUNT_COLUMNS = STATUS_KEHADIRAN + ["total"]
+
+def _empty(key_names):
+    index = pd.MultiIndex.from_arrays([[] for _ in key_names], names=key_names) if len(key_names) > 1 else pd.Index([], name=key_names[0])
+    return pd.DataFrame(0, index=index, columns=COUNT_COLUMNS, dtype="int64")
+
+def _count(keys, status):
+    """Jumlah baris per kombinasi `keys` x status, dengan kolom COUNT_COLUMNS."""
+    if keys.empty:
+        return _empty(list(keys.columns))
+    status = status.astype(object).fillna("")
+    counts = keys.assign(status=status).groupby(list(keys.columns) + ["status"], dropna=False, sort=False).size()
+    counts = counts.unstack("status", fill_value=0)
+    counts["total"] = counts.sum(axis=1)
+    counts = counts.drop(columns="", errors="ignore")
+    # Status di luar daftar baku tetap ikut dihitung di `total`
+    return counts.reindex(columns=COUNT_COLUMNS, fill_value=0)
+
+def _positions(index, values):
+    """(index, posisi) nilai `values` di `index`; nilai yang belum ada ditambahkan di akhir index."""
+    positions = index.get_indexer(values)
+    missing = positions < 0
+    if missing.any():
+        index = index.append(pd.Index(pd.unique(values[missing])))
+        positions = index.get_indexer(values)
+    return index, positions
+
+class MenteeCounter:
+    """
+    Matriks penghitung per mentee yang diperbarui in-place saat presensi bertambah.
+    mentee_id dan nomor pertemuan dipetakan ke posisi padat (urutan kemunculan) lewat pd.Index,
+    sehingga ukuran matriks mengikuti jumlah mentee dan pertemuan berbeda, bukan nilai terbesarnya.
+    Kolom `counts` mengikuti COUNT_COLUMNS, dan `seen[mentee, pertemuan]` menandai pertemuan yang
+    pernah tercatat untuk mentee itu.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.mentees = pd.Index([], dtype="int64")
+        self.pertemuan = pd.Index([], dtype="int64")
+        self.counts = np.zeros((0, len(COUNT_COLUMNS)), dtype=np.int64)
+        self.seen = np.zeros((0, 0), dtype=bool)
+
+    def _grow(self):
+        rows, cols = len(self.mentees), len(self.pertemuan)
+        if rows > self.counts.shape[0]:
+            counts = np.zeros((rows, self.counts.shape[1]), dtype=np.int64)
+            counts[:self.counts.shape[0]] = self.counts
+            self.counts = counts
+        if (rows, cols) != self.seen.shape:
+            seen = np.zeros((rows, cols), dtype=bool)
+            seen[:self.seen.shape[0], :self.seen.shape[1]] = self.seen
+            self.seen = seen
+
+    def add(self, mentee_ids, status, pertemuan):
+        """Menambahkan baris presensi (array mentee_id, status_kehadiran, pertemuan) ke matriks."""
+        mentee_ids = np.asarray(mentee_ids, dtype=np.int64)
+        pertemuan = np.asarray(pertemuan, dtype=np.int64)
+        if not len(mentee_ids):
+            return
+        # Posisi status di STATUS_KEHADIRAN; status kosong/di luar daftar hanya masuk `total`
+        status_pos = pd.Categorical(np.asarray(status, dtype=object), categories=STATUS_KEHADIRAN).codes
+        width = len(COUNT_COLUMNS)
+        with self.lock:
+            self.mentees, rows = _positions(self.mentees, mentee_ids)
+            self.pertemuan, cols = _positions(self.pertemuan, pertemuan)
+            self._grow()
+            known = status_pos >= 0
+            flat = np.concatenate([rows[known] * width + status_pos[known], rows * width + (width - 1)])
+            self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+            self.seen[rows, cols] = True
+
+    def rekap(self, mentee_ids):
+        """(DataFrame jumlah COUNT_COLUMNS per mentee_id, jumlah pertemuan berbeda) untuk mentee yang diminta."""
+        mentee_ids = np.asarray(mentee_ids, dtype=np.int64)
+        with self.lock:
+            rows = self.mentees.get_indexer(mentee_ids)
+            inside = rows >= 0
+            counts = np.zeros((len(mentee_ids), len(COUNT_COLUMNS)), dtype=np.int64)
+            counts[inside] = self.counts[rows[inside]]
+            distinct_pertemuan = int(self.seen[rows[inside]].any(axis=0).sum()) if inside.any() else 0
+        frame = pd.DataFrame(counts, columns=COUNT_COLUMNS, index=pd.Index(mentee_ids, name="mentee_id"))
+        return frame, distinct_pertemuan
+
+def _merge(old, new):
+    if old is None:
+        return new
+    return old.add(new, fill_value=0).fillna(0).astype("int64")
+
+class AttendanceAggregates:
+    """Agregat presensi yang dipakai bersama semua sesi; perbarui lewat refresh()."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.source = None # Tabel fakta terakhir yang sudah diagregasi
+        self.consumed = 0 # Jumlah baris tabel fakta yang sudah masuk agregat
+        self.generation = None # frame_generation() tabel fakta yang sudah diagregasi
+        self.cube = None
+        self.mentee = MenteeCounter()
+
+    def _is_append(self, facts):
+        return (
+            self.source is not None
+            and self.generation is not None
+            and frame_generation(facts) == self.generation
+            and self.consumed <= len(facts)
+        )
+
+    def _add_rows(self, rows):
+        if rows.empty:
+            return
+        cube_keys = rows[CUBE_KEYS]
+        self.cube = _merge(self.cube, _count(cube_keys, rows['status_kehadiran']))
+        self.mentee.add(rows['mentee_id'].to_numpy(), rows['status_kehadiran'], rows['pertemuan'].to_numpy())
+
+    def refresh(self, facts):
+        """Memperbarui agregat sesuai tabel fakta terbaru dan mengembalikan (cube, MenteeCounter)."""
+        with self.lock:
+            if facts is self.source:
+                return self.cube, self.mentee
+            required = {"mentee_id", "status_kehadiran"} | set(CUBE_KEYS)
+            if not required.issubset(facts.columns):
+                self.cube, self.mentee = None, MenteeCounter()
+            elif self._is_append(facts):
+                # MenteeCounter diperbarui in-place; cube lama tetap utuh untuk pembaca yang sedang memakainya
+                self._add_rows(facts.iloc[self.consumed:])
+            else:
+                # Objek baru agar pembaca yang masih memegang agregat lama tidak melihat pembangunan ulang
+                self.cube, self.mentee = None, MenteeCounter()
+                self._add_rows(facts)
+            if self.cube is None:
+                self.cube = _empty(CUBE_KEYS)
+            self.consumed = len(facts)
+            self.generation = frame_generation(facts)
+            self.source = facts
+            return self.cube, self.mentee
+
+@st.cache_resource
+def _get_store():
+    return AttendanceAggregates()
+
+def get_aggregates():
+    """(cube, MenteeCounter) agregat presensi yang sudah diperbarui sesuai tabel fakta terbaru."""
+    return _get_store().refresh(get_facts())
+
+def filter_cube(cube, start=None, end=None, mentor_ids=None):
+    """Memilih bagian cube untuk rentang tanggal [start, end] dan/atau daftar mentor_id."""
+    mask = pd.Series(True, index=cube.index)
+    tanggal = cube.index.get_level_values("tanggal")
+    if start is not None:
+        mask &= tanggal >= start
+    if end is not None:
+        mask &= tanggal <= end
+    if mentor_ids is not None:
+        mask &= cube.index.get_level_values("mentor_id").isin(list(mentor_ids))
+    return cube[mask.to_numpy()]
+
+def hadir_rate(counts):
+    """Persentase status 'Hadir' dari seluruh presensi pada setiap grup."""
+    return (counts["Hadir"] / counts["total"].where(counts["total"] > 0) * 100).fillna(0)
@@ -0,0 +1,136 @@
+import pandas as pd
+import streamlit as st
+
+from utils.aggregates import filter_cube, get_aggregates, hadir_rate
+from utils.cache_versions import worksheet_version
+from utils.data_loader import DEFAULT_TTL, load_frame
+from utils.schema import STATUS_KEHADIRAN
+from utils.timeseries import daily_series, rollup, slice_dates
+
+# Mesin analitik bersama untuk halaman Dashboard dan Statistik.
+# Setiap fungsi publik menerima filter yang sama (rentang tanggal `start`/`end` dan daftar
+# `mentor_ids`) lalu membaca agregat dari utils.aggregates. Hasilnya di-memo dengan
+# st.cache_data ber-key (versi data, filter), jadi permintaan identik dari banyak sesi
+# dihitung sekali. Peran, mentor yang login, dan mentor yang dipilih admin semuanya
+# diterjemahkan halaman menjadi `mentor_ids`, sehingga sesi yang melihat data sama berbagi hasil.
+# Hasil st.cache_data berupa salinan, jadi boleh diubah oleh halaman.
+
+MAX_ENTRIES = 256
+RATE_COLUMN = "Rata-rata Kehadiran (%)"
+OTHER_STATUS = "Lainnya" # Status kosong atau di luar STATUS_KEHADIRAN
+
+_memoized = st.cache_data(ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+
+def _data_version():
+    return tuple(worksheet_version(name) for name in ("presensi", "mentee", "mentor"))
+
+def filter_key(start, end, mentor_ids):
+    """Menormalkan filter agar filter yang setara menghasilkan key cache yang sama."""
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    if mentor_ids is not None:
+        mentor_ids = tuple(sorted({int(m) for m in mentor_ids if pd.notna(m)}))
+    return _data_version(), start, end, mentor_ids
+
+def _cube(start, end, mentor_ids):
+    cube, _ = get_aggregates()
+    return filter_cube(cube, start, end, mentor_ids)
+
+def _rates(counts, key_name):
+    counts = counts[counts["total"] > 0]
+    return pd.DataFrame({key_name: counts.index, RATE_COLUMN: hadir_rate(counts).to_numpy()})
+
+@_memoized
+def _attendance_summary(version, start, end, mentor_ids):
+    cube = _cube(start, end, mentor_ids)
+    return {"total": int(cube["total"].sum()), "hadir": int(cube["Hadir"].sum())}
+
+@_memoized
+def _attendance_by_meeting(version, start, end, mentor_ids):
+    return _rates(_cube(start, end, mentor_ids).groupby(level="pertemuan").sum(), "pertemuan")
+
+@_memoized
+def _status_by_meeting(version, start, end, mentor_ids):
+    per_pertemuan = _cube(start, end, mentor_ids).groupby(level="pertemuan").sum()
+    long = per_pertemuan[STATUS_KEHADIRAN].rename_axis(columns="status_kehadiran").stack().reset_index(name="Jumlah")
+    return long[long["Jumlah"] > 0].reset_index(drop=True)
+
+@_memoized
+def _status_distribution(version, start, end, mentor_ids):
+    cube = _cube(start, end, mentor_ids)
+    totals = cube[STATUS_KEHADIRAN].sum()
+    # Baris dengan status kosong/tidak baku hanya terhitung di `total`; tetap ditampilkan sebagai satu irisan
+    totals[OTHER_STATUS] = cube["total"].sum() - totals.sum()
+    totals = totals[totals > 0]
+    return pd.DataFrame({"Status": totals.index, "Jumlah": totals.to_numpy()})
+
+@st.cache_resource(ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def _daily(version, mentor_ids):
+    # Deret harian seluruh rentang tanggal dipakai bersama (tidak disalin); rentang tanggal dipotong belakangan
+    return daily_series(_cube(None, None, mentor_ids))
+
+@_memoized
+def _attendance_trend(version, start, end, mentor_ids, period):
+    per_periode = rollup(slice_dates(_daily(version, mentor_ids), start, end), period)
+    return _rates(per_periode, "periode")
+
+@_memoized
+def _mentor_ranking(version, start, end, mentor_ids):
+    per_mentor = _rates(_cube(start, end, mentor_ids).groupby(level="mentor_id").sum(), "mentor_id")
+    # Hanya mentor yang terdaftar (presensi tanpa mentee/mentor terdaftar tidak ikut diperingkat)
+    mentor_df = load_frame("mentor")
+    if mentor_df.empty:
+        return pd.DataFrame(columns=["mentor_id", "nama", RATE_COLUMN])
+    ranking = per_mentor.merge(mentor_df[["id", "nama"]], left_on="mentor_id", right_on="id")
+    return ranking[["mentor_id", "nama", RATE_COLUMN]].sort_values(RATE_COLUMN, ascending=False, ignore_index=True)
+
+@_memoized
+def _mentee_recap(version, mentor_ids):
+    _, counter = get_aggregates()
+    mentee_df, mentor_df = load_frame("mentee"), load_frame("mentor")
+    if mentee_df.empty:
+        return pd.DataFrame()
+    if mentor_ids is not None:
+        mentee_df = mentee_df[mentee_df["mentor_id"].isin(mentor_ids)]
+    # Baris matriks penghitung (utils.aggregates.MenteeCounter) untuk mentee terpilih, tanpa pivot_table
+    counts, total_pertemuan = counter.rekap(mentee_df["id"].to_numpy())
+    has_presensi = counts["total"].to_numpy() > 0
+    recap = mentee_df[["id", "nama", "mentor_id"]][has_presensi].rename(columns={"id": "mentee_id"}).reset_index(drop=True)
+    recap[STATUS_KEHADIRAN] = counts[STATUS_KEHADIRAN].to_numpy()[has_presensi]
+    mentor_names = mentor_df.set_index("id")["nama"].to_dict() if not mentor_df.empty else {}
+    recap["nama_mentor"] = recap["mentor_id"].map(mentor_names)
+    # Persentase dihitung terhadap jumlah pertemuan berbeda yang tercatat untuk mentee-mentee terpilih
+    recap["% Hadir Murni"] = (recap["Hadir"] / total_pertemuan * 100).round(2) if total_pertemuan else 0
+    return recap[["mentee_id", "nama", "nama_mentor"] + STATUS_KEHADIRAN + ["% Hadir Murni"]]
+
+def attendance_summary(start=None, end=None, mentor_ids=None):
+    """{'total': jumlah presensi, 'hadir': jumlah status 'Hadir'} untuk filter yang diberikan."""
+    return _attendance_summary(*filter_key(start, end, mentor_ids))
+
+def attendance_by_meeting(start=None, end=None, mentor_ids=None):
+    """DataFrame (pertemuan, Rata-rata Kehadiran (%)) untuk pertemuan yang memiliki presensi."""
+    return _attendance_by_meeting(*filter_key(start, end, mentor_ids))
+
+def status_by_meeting(start=None, end=None, mentor_ids=None):
+    """DataFrame panjang (pertemuan, status_kehadiran, Jumlah) untuk grafik bertumpuk."""
+    return _status_by_meeting(*filter_key(start, end, mentor_ids))
+
+def status_distribution(start=None, end=None, mentor_ids=None):
+    """DataFrame (Status, Jumlah), hanya status yang muncul; status kosong/tidak baku digabung menjadi 'Lainnya'."""
+    return _status_distribution(*filter_key(start, end, mentor_ids))
+
+def attendance_trend(period, start=None, end=None, mentor_ids=None):
+    """
+    DataFrame (periode, Rata-rata Kehadiran (%)) per minggu ('W'), bulan ('M'), kuartal ('Q'),
+    atau semester ('S'); `periode` adalah tanggal awal periode, terurut.
+    """
+    return _attendance_trend(*filter_key(start, end, mentor_ids), period)
+
+def mentor_ranking(start=None, end=None, mentor_ids=None):
+    """DataFrame (mentor_id, nama, Rata-rata Kehadiran (%)) terurut dari kehadiran tertinggi."""
+    return _mentor_ranking(*filter_key(start, end, mentor_ids))
+
+def mentee_recap(mentor_ids=None):
+    """Rekap jumlah status per mentee (seluruh waktu) untuk mentee milik `mentor_ids` (None = semua)."""
+    version, _, _, mentor_ids = filter_key(None, None, mentor_ids)
+    return _mentee_recap(version, mentor_ids)
@@ -0,0 +1,281 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from datetime import date, timedelta
+
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, numericise_all, rowcol_to_a1
+
+# Backend penyimpanan yang bisa dipilih lewat pengaturan `storage_backend`:
+# - "gspread" : Google Sheets sungguhan (default, lihat utils.sheets_utils)
+# - "memory"  : worksheet palsu di memori proses, hilang saat server dimatikan
+# - "sqlite"  : worksheet palsu yang disimpan di file SQLite (`fake_db_path`)
+# Backend palsu meniru bagian API gspread Worksheet yang dipakai aplikasi
+# (get_all_records, get_all_values, get_values/get, row_values, col_values,
+# append_row(s), update, batch_update, delete_rows, serta batch_update level spreadsheet
+# untuk deleteDimension) sehingga halaman bisa dijalankan
+# dan diukur tanpa jaringan. `fake_latency` (detik) menambahkan jeda buatan per panggilan
+# untuk mensimulasikan latensi API sungguhan.
+
+FAKE_BACKENDS = ("memory", "sqlite")
+
+def _cell(value):
+    # Sheets mengembalikan semua nilai sebagai teks terformat
+    return "" if value is None else str(value)
+
+class FakeWorksheet(ABC):
+    """Dasar worksheet palsu; subclass menyediakan penyimpanan baris (_load/_append/_set_row/_delete)."""
+
+    def __init__(self, title, sheet_id, latency=0.0):
+        self.title = title
+        self.id = sheet_id
+        self.latency = latency
+        self.lock = threading.RLock()
+
+    def _simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    # --- Primitif penyimpanan (diimplementasikan subclass) ---
+    @abstractmethod
+    def _load(self):
+        """Seluruh baris fisik (baris 1 = header) sebagai list of list."""
+
+    @abstractmethod
+    def _append(self, rows):
+        """Menambahkan baris di akhir sheet."""
+
+    @abstractmethod
+    def _set_row(self, row_number, values):
+        """Mengganti isi baris fisik `row_number` (mulai dari 1)."""
+
+    @abstractmethod
+    def _delete(self, start, end):
+        """Menghapus baris fisik `start` sampai `end` (inklusif, mulai dari 1)."""
+
+    # --- API ala gspread ---
+    def get_all_values(self):
+        self._simulate_latency()
+        with self.lock:
+            rows = self._load()
+        width = max((len(r) for r in rows), default=0)
+        return [r + [""] * (width - len(r)) for r in rows]
+
+    def get_all_records(self):
+        values = self.get_all_values()
+        if not values:
+            return []
+        header = values[0]
+        return [dict(zip(header, numericise_all(row))) for row in values[1:]]
+
+    def get_values(self, range_name=None):
+        values = self.get_all_values()
+        if range_name is None:
+            return values
+        grid = a1_range_to_grid_range(range_name)
+        start_row, end_row = grid.get("startRowIndex", 0), grid.get("endRowIndex", len(values))
+        start_col, end_col = grid.get("startColumnIndex", 0), grid.get("endColumnIndex")
+        selected = [row[start_col:end_col] for row in values[start_row:end_row]]
+        # Seperti API Sheets: baris kosong di akhir rentang tidak dikembalikan
+        while selected and not any(selected[-1]):
+            selected.pop()
+        return selected
+
+    get = get_values
+
+    def row_values(self, row):
+        self._simulate_latency()
+        with self.lock:
+            rows = self._load()
+        values = list(rows[row - 1]) if 0 < row <= len(rows) else []
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def col_values(self, col):
+        self._simulate_latency()
+        with self.lock:
+            rows = self._load()
+        values = [r[col - 1] if len(r) >= col else "" for r in rows]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values])
+
+    def append_rows(self, values, **kwargs):
+        self._simulate_latency()
+        with self.lock:
+            first_row = len(self._load()) + 1
+            self._append([[_cell(v) for v in row] for row in values])
+        # Respons meniru API Sheets (dipakai utils.row_index untuk mengetahui baris yang ditulis)
+        last_column = rowcol_to_a1(1, max((len(row) for row in values), default=1)).rstrip("0123456789")
+        return {"updates": {"updatedRange": f"{self.title}!A{first_row}:{last_column}{first_row + len(values) - 1}"}}
+
+    def _write_range(self, range_name, values):
+        grid = a1_range_to_grid_range(range_name)
+        first_row = grid.get("startRowIndex", 0) + 1
+        first_col = grid.get("startColumnIndex", 0)
+        rows = self._load()
+        for offset, new_values in enumerate(values):
+            row_number = first_row + offset
+            if row_number > len(rows):
+                self._append([[] for _ in range(row_number - len(rows))])
+                rows = self._load()
+            row = list(rows[row_number - 1])
+            row.extend([""] * (first_col + len(new_values) - len(row)))
+            row[first_col:first_col + len(new_values)] = [_cell(v) for v in new_values]
+            self._set_row(row_number, row)
+            rows[row_number - 1] = row
+
+    def update(self, *args, **kwargs):
+        # Mendukung urutan argumen gspread 5 (range, values) dan gspread 6 (values, range)
+        if args and isinstance(args[0], str):
+            range_name, values = args[0], args[1] if len(args) > 1 else kwargs.get("values")
+        else:
+            values = args[0] if args else kwargs.get("values")
+            range_name = args[1] if len(args) > 1 else kwargs.get("range_name", "A1")
+        self._simulate_latency()
+        with self.lock:
+            self._write_range(range_name, values)
+
+    def batch_update(self, data, **kwargs):
+        self._simulate_latency()
+        with self.lock:
+            for item in data:
+                self._write_range(item["range"], item["values"])
+
+    def delete_rows(self, start_index, end_index=None):
+        self._simulate_latency()
+        with self.lock:
+            self._delete(start_index, end_index or start_index)
+
+class MemoryWorksheet(FakeWorksheet):
+    """Worksheet palsu yang seluruh barisnya disimpan di list Python."""
+
+    def __init__(self, title, sheet_id, header, latency=0.0):
+        super().__init__(title, sheet_id, latency)
+        self.rows = [list(header)]
+
+    def _load(self):
+        return [list(r) for r in self.rows]
+
+    def _append(self, rows):
+        self.rows.extend(list(r) for r in rows)
+
+    def _set_row(self, row_number, values):
+        self.rows[row_number - 1] = list(values)
+
+    def _delete(self, start, end):
+        del self.rows[start - 1:end]
+
+class SqliteWorksheet(FakeWorksheet):
+    """
+    Worksheet palsu yang disimpan di SQLite. Urutan baris mengikuti kolom `seq`,
+    sehingga baris fisik ke-n adalah baris ke-n menurut urutan `seq`.
+    """
+
+    def __init__(self, db_path, title, sheet_id, header, latency=0.0):
+        super().__init__(title, sheet_id, latency)
+        self.db_path = db_path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sheet_rows ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, worksheet TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sheet_rows_ws ON sheet_rows (worksheet, seq)")
+            exists = conn.execute("SELECT 1 FROM sheet_rows WHERE worksheet = ? LIMIT 1", (title,)).fetchone()
+            if not exists:
+                conn.execute("INSERT INTO sheet_rows (worksheet, data) VALUES (?, ?)", (title, json.dumps(list(header))))
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _seqs(self, conn):
+        return [seq for (seq,) in conn.execute("SELECT seq FROM sheet_rows WHERE worksheet = ? ORDER BY seq", (self.title,))]
+
+    def _load(self):
+        with closing(self._connect()) as conn:
+            return [json.loads(data) for (data,) in conn.execute(
+                "SELECT data FROM sheet_rows WHERE worksheet = ? ORDER BY seq", (self.title,))]
+
+    def _append(self, rows):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT INTO sheet_rows (worksheet, data) VALUES (?, ?)",
+                             [(self.title, json.dumps(list(r))) for r in rows])
+
+    def _set_row(self, row_number, values):
+        with closing(self._connect()) as conn, conn:
+            seq = self._seqs(conn)[row_number - 1]
+            conn.execute("UPDATE sheet_rows SET data = ? WHERE seq = ?", (json.dumps(list(values)), seq))
+
+    def _delete(self, start, end):
+        with closing(self._connect()) as conn, conn:
+            seqs = self._seqs(conn)[start - 1:end]
+            conn.executemany("DELETE FROM sheet_rows WHERE seq = ?", [(seq,) for seq in seqs])
+
+class FakeSpreadsheet:
+    """Pengganti gspread Spreadsheet untuk backend palsu."""
+
+    def __init__(self, worksheets):
+        self.worksheets_by_title = {ws.title: ws for ws in worksheets}
+
+    def worksheet(self, title):
+        if title not in self.worksheets_by_title:
+            raise WorksheetNotFound(title)
+        return self.worksheets_by_title[title]
+
+    def worksheets(self):
+        return list(self.worksheets_by_title.values())
+
+    def batch_update(self, body):
+        """Mendukung permintaan deleteDimension (baris) seperti spreadsheets.batchUpdate di Sheets API."""
+        by_id = {ws.id: ws for ws in self.worksheets_by_title.values()}
+        for request in body.get("requests", []):
+            if "deleteDimension" not in request or request["deleteDimension"]["range"].get("dimension") != "ROWS":
+                raise NotImplementedError(f"Permintaan batch_update tidak didukung backend palsu: {request}")
+            grid = request["deleteDimension"]["range"]
+            by_id[grid["sheetId"]].delete_rows(grid["startIndex"] + 1, grid["endIndex"])
+        return {"replies": [{} for _ in body.get("requests", [])]}
+
+def open_fake_spreadsheet(backend, headers, latency=0.0, db_path=None):
+    """Membuat spreadsheet palsu ('memory' atau 'sqlite') berisi worksheet dengan header `headers`."""
+    worksheets = []
+    for sheet_id, (title, header) in enumerate(headers.items()):
+        if backend == "memory":
+            worksheets.append(MemoryWorksheet(title, sheet_id, header, latency))
+        elif backend == "sqlite":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            worksheets.append(SqliteWorksheet(db_path, title, sheet_id, header, latency))
+        else:
+            raise ValueError(f"Backend penyimpanan tidak dikenal: {backend}")
+    return FakeSpreadsheet(worksheets)
+
+def seed_demo_data(spreadsheet, mentors=10, mentees_per_mentor=10, pertemuan=8, start=date(2024, 2, 5)):
+    """Mengisi spreadsheet palsu yang masih kosong dengan data contoh untuk uji coba dan benchmark."""
+    mentor_ws = spreadsheet.worksheet("mentor")
+    if len(mentor_ws.col_values(1)) > 1:
+        return # Sudah berisi data
+    rng = random.Random(42)
+    mentor_ws.append_rows([[i, f"Mentor {i}", f"mentor{i}@sttnf.ac.id"] for i in range(1, mentors + 1)])
+    mentee_rows = []
+    for mentor_id in range(1, mentors + 1):
+        for j in range(mentees_per_mentor):
+            mentee_id = len(mentee_rows) + 1
+            mentee_rows.append([mentee_id, f"Mentee {mentee_id}", f"K{mentor_id}", mentor_id])
+    spreadsheet.worksheet("mentee").append_rows(mentee_rows)
+    presensi_rows = []
+    for ke in range(1, pertemuan + 1):
+        tanggal = (start + timedelta(weeks=ke - 1)).strftime("%Y-%m-%d")
+        for mentee in mentee_rows:
+            status = rng.choices(["Hadir", "Sakit", "Izin", "Alfa"], weights=[80, 5, 7, 8])[0]
+            presensi_rows.append([len(presensi_rows) + 1, mentee[0], tanggal, ke, status])
+    spreadsheet.worksheet("presensi").append_rows(presensi_rows)
@@ -0,0 +1,37 @@
+import threading
+
+import streamlit as st
+
+# Nomor versi (generation counter) per worksheet untuk invalidasi cache yang terarah.
+# Setiap jalur tulis menaikkan versi worksheet yang disentuhnya, dan setiap cache turunan
+# menyertakan versi worksheet sumbernya sebagai bagian dari key. Perubahan pada satu
+# worksheet hanya membuat cache yang bergantung padanya dihitung ulang, tanpa
+# st.cache_data.clear() yang menghapus seluruh cache aplikasi.
+
+class VersionRegistry:
+    """Penghitung versi per worksheet yang aman dipakai dari banyak thread."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions = {}
+
+    def get(self, name):
+        with self.lock:
+            return self.versions.get(name, 0)
+
+    def bump(self, name):
+        with self.lock:
+            self.versions[name] = self.versions.get(name, 0) + 1
+            return self.versions[name]
+
+@st.cache_resource
+def get_version_registry():
+    return VersionRegistry()
+
+def worksheet_version(name):
+    """Versi data worksheet `name` saat ini; dipakai sebagai bagian key cache."""
+    return get_version_registry().get(name)
+
+def bump_version(name):
+    """Menandai data worksheet `name` berubah sehingga cache turunannya dihitung ulang."""
+    return get_version_registry().bump(name)
@@ -0,0 +1,29 @@
+import os
+import streamlit as st
+
+def get_setting(key, default=None):
+    """
+    Membaca pengaturan opsional aplikasi.
+    Urutan prioritas: environment variable `BKPK_<KEY>` lalu `st.secrets[key]`, jika tidak ada pakai `default`.
+    """
+    env_value = os.environ.get(f"BKPK_{key.upper()}")
+    if env_value is not None:
+        return env_value
+    try:
+        return st.secrets.get(key, default)
+    except Exception: # File secrets tidak ada atau tidak dapat dibaca
+        return default
+
+def get_bool_setting(key, default=False):
+    """Membaca pengaturan bernilai ya/tidak (mis. 'true', '1', 'yes')."""
+    value = get_setting(key, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "ya", "on")
+    return bool(value)
+
+def get_float_setting(key, default):
+    """Membaca pengaturan numerik, kembali ke `default` jika nilainya tidak valid."""
+    try:
+        return float(get_setting(key, default))
+    except (TypeError, ValueError):
+        return default
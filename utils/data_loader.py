@@ -0,0 +1,82 @@
+import itertools
+import threading
+
+import streamlit as st
+
+from utils.cache_versions import worksheet_version
+from utils.local_store import INCREMENTAL_TABLES, read_delta, read_values
+from utils.schema import append_frame, build_frame
+from utils.sequence_utils import reconcile_ids
+from utils.sheets_utils import WORKSHEET_NAMES
+
+# Loader bertipe yang dipakai bersama oleh semua halaman.
+# Nilai mentah tiap worksheet dibaca sekali, diubah menjadi DataFrame ringkas sesuai
+# utils.schema, lalu disimpan di st.cache_resource sehingga semua sesi dan halaman
+# memakai objek yang sama tanpa menyalin atau mengonversi ulang di setiap rerun.
+# Cache di-key dengan versi worksheet (utils.cache_versions): setelah perubahan sampai di
+# Sheets hanya worksheet yang berubah yang dibaca ulang.
+# Worksheet append-only (presensi) dibaca bertahap: hanya baris baru yang diambil dan dibangun
+# menjadi DataFrame bertipe, lalu disambung ke frame sebelumnya.
+# Setiap frame membawa nomor pemuatan penuh (frame_generation) agar turunan yang dirawat bertahap
+# (utils.aggregates, utils.fact_table) tahu kapan data dimuat ulang penuh dan harus dibangun ulang.
+# Karena dipakai bersama, DataFrame hasil load_frame() TIDAK boleh diubah in-place;
+# gunakan .assign()/.copy() jika halaman perlu menambah kolom.
+
+DEFAULT_TTL = 300 # detik, batas basi untuk perubahan yang dibuat langsung di Google Sheets
+LOAD_GENERATION = "load_generation" # Kunci di DataFrame.attrs
+
+@st.cache_resource
+def _get_generations():
+    return itertools.count(1)
+
+@st.cache_resource
+def _get_delta_store(name):
+    # Frame bertipe terakhir dan penanda baca read_delta() untuk worksheet append-only, dipakai bersama semua sesi
+    return {"lock": threading.Lock(), "since": None, "frame": None}
+
+def new_generation():
+    """Nomor generasi baru yang unik dalam proses, untuk frame yang dibangun ulang penuh (lihat frame_generation)."""
+    return next(_get_generations())
+
+def _full_frame(name, header, rows):
+    df = build_frame(name, header, rows)
+    df.attrs[LOAD_GENERATION] = new_generation()
+    return df
+
+def _load_incremental(name):
+    store = _get_delta_store(name)
+    with store["lock"]:
+        mode, header, rows, since = read_delta(name, store["since"])
+        if mode == "full" or store["frame"] is None:
+            frame = _full_frame(name, header, rows)
+        elif rows:
+            frame = append_frame(store["frame"], build_frame(name, header, rows))
+        else:
+            frame = store["frame"]
+        store["since"], store["frame"] = since, frame
+        return frame
+
+@st.cache_resource(ttl=DEFAULT_TTL, max_entries=2 * len(WORKSHEET_NAMES), show_spinner=False)
+def _load_frame(name, version):
+    if name in INCREMENTAL_TABLES:
+        df = _load_incremental(name)
+    else:
+        df = _full_frame(name, *read_values(name))
+    if 'id' in df.columns:
+        reconcile_ids(name, df['id']) # Selaraskan sequence ID dengan data terbaru
+    return df
+
+def load_frame(name):
+    """DataFrame bertipe untuk worksheet `name` ('mentor', 'mentee', atau 'presensi')."""
+    return _load_frame(name, worksheet_version(name))
+
+def load_frames(*names):
+    return tuple(load_frame(name) for name in names)
+
+def frame_generation(df):
+    """
+    Nomor pemuatan penuh DataFrame hasil load_frame(). Selama nomornya sama, frame yang lebih baru
+    hanya menambah baris di belakang frame sebelumnya; nomor baru berarti data dimuat ulang penuh
+    (mis. ada baris yang diubah atau dihapus di Sheets).
+    """
+    return df.attrs.get(LOAD_GENERATION)
@@ -0,0 +1,41 @@
+import pandas as pd
+
+# Presensi terurut menurut tanggal untuk filter rentang tanggal.
+# Baris diurutkan sekali (stabil, urutan sheet dipertahankan untuk tanggal yang sama) saat data
+# dimuat; batas tanggal disimpan, dan rentang [start, end] dicari dengan binary search
+# (searchsorted) lalu diambil sebagai potongan iloc. Mengganti rentang di sidebar cukup
+# O(log n) ditambah ukuran hasil, tanpa membandingkan seluruh kolom tanggal.
+
+class DateSortedFrame:
+    """DataFrame presensi bertanggal valid, terurut menurut `column`, dengan batas tanggal yang sudah dihitung."""
+
+    def __init__(self, df, column="tanggal"):
+        self.column = column
+        if column not in df.columns:
+            # Tanpa kolom tanggal tidak ada yang bisa diurutkan; rentang apa pun mengembalikan semua baris
+            self.frame, self.dates, self.undated = df, None, 0
+            self.min_date = self.max_date = None
+            return
+        dated = df[column].notna()
+        self.undated = int((~dated).sum())
+        frame = df[dated] if self.undated else df
+        self.frame = frame.sort_values(column, kind="stable", ignore_index=True)
+        self.dates = self.frame[column].to_numpy()
+        self.min_date = self.frame[column].iat[0] if len(self.frame) else None
+        self.max_date = self.frame[column].iat[-1] if len(self.frame) else None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def bounds(self, start=None, end=None):
+        """Posisi (awal, akhir) baris dengan start <= tanggal <= end."""
+        if self.dates is None:
+            return 0, len(self.frame)
+        lo = self.dates.searchsorted(pd.Timestamp(start).to_datetime64(), side="left") if start is not None else 0
+        hi = self.dates.searchsorted(pd.Timestamp(end).to_datetime64(), side="right") if end is not None else len(self.dates)
+        return int(lo), int(max(lo, hi))
+
+    def between(self, start=None, end=None):
+        """Baris dengan start <= tanggal <= end (batas inklusif) sebagai potongan dari frame terurut."""
+        lo, hi = self.bounds(start, end)
+        return self.frame.iloc[lo:hi]
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import re
+import time
+
+from gspread.utils import rowcol_to_a1
+
+# Pengambilan data bertahap (delta) untuk worksheet yang praktis append-only seperti presensi.
+# Loader mengingat jumlah baris terakhir yang sudah dibaca. Saat refresh, hanya rentang
+# mulai beberapa baris terakhir (sampel) sampai akhir sheet yang dibaca dalam satu panggilan:
+# - sampel dibandingkan dengan checksum yang disimpan; jika berbeda (ada edit/hapus) atau
+#   jumlah baris menyusut, data dimuat ulang penuh;
+# - selebihnya adalah baris baru yang cukup ditambahkan ke data yang sudah ada.
+# Edit di atas rentang sampel tidak terdeteksi, sehingga data tetap dimuat ulang penuh
+# secara berkala (`max_age`).
+
+SAMPLE_ROWS = 5
+DEFAULT_FULL_RELOAD_AGE = 3600 # detik
+
+def _normalize(rows):
+    # Sel kosong di ujung baris tidak selalu dikembalikan API, jadi abaikan saat membandingkan
+    normalized = []
+    for row in rows:
+        row = [str(v) for v in row]
+        while row and row[-1] == "":
+            row.pop()
+        normalized.append(row)
+    return normalized
+
+def rows_checksum(rows):
+    return hashlib.sha1(json.dumps(_normalize(rows)).encode("utf-8")).hexdigest()
+
+def _last_column(width):
+    return re.sub(r"\d+", "", rowcol_to_a1(1, max(1, width)))
+
+def _full_state(values):
+    data_rows = values[1:]
+    return {
+        "header": list(values[0]) if values else [],
+        "row_count": len(values),
+        "tail_checksum": rows_checksum(data_rows[-SAMPLE_ROWS:]),
+        "full_loaded_at": time.time(),
+    }
+
+def fetch_delta(ws, state, max_age=DEFAULT_FULL_RELOAD_AGE):
+    """
+    Membaca perubahan worksheet sejak `state` (None jika belum pernah dibaca).
+    Mengembalikan (mode, rows, state_baru):
+    - mode "full"   : `rows` adalah seluruh isi sheet termasuk header
+    - mode "append" : `rows` hanya baris data baru (bisa kosong)
+    """
+    # Sheet yang baru berisi header selalu dibaca penuh (murah, dan rentang A2 bisa di luar batas grid)
+    if not state or state["row_count"] <= 1 or time.time() - state["full_loaded_at"] > max_age:
+        values = ws.get_all_values()
+        return "full", values, _full_state(values)
+
+    overlap = min(SAMPLE_ROWS, state["row_count"] - 1) # Baris data terakhir yang dijadikan sampel (minimal 1)
+    start_row = state["row_count"] - overlap + 1
+    fetched = ws.get_values(f"A{start_row}:{_last_column(len(state['header']))}")
+    sample, new_rows = fetched[:overlap], fetched[overlap:]
+    if len(sample) < overlap or rows_checksum(sample) != state["tail_checksum"]:
+        # Baris berkurang atau isi sampel berubah: muat ulang penuh
+        values = ws.get_all_values()
+        return "full", values, _full_state(values)
+
+    new_state = dict(state)
+    new_state["row_count"] = state["row_count"] + len(new_rows)
+    new_state["tail_checksum"] = rows_checksum((sample + new_rows)[-SAMPLE_ROWS:])
+    return "append", new_rows, new_state
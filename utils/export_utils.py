@@ -0,0 +1,162 @@
+import io
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+import xlsxwriter
+
+from utils.analytics import attendance_by_meeting, filter_key, mentee_recap, status_by_meeting
+from utils.data_loader import DEFAULT_TTL
+from utils.fact_table import get_facts, get_facts_by_date
+from utils.schema import STATUS_KEHADIRAN
+
+# Ekspor laporan presensi ke Excel.
+# Workbook hanya dibuat saat diminta (bukan di setiap rerun halaman) dengan mode constant_memory
+# xlsxwriter: baris ditulis berurutan per sheet dan langsung dibuang dari memori, serta data sumber
+# diubah ke nilai Python per potongan (CHUNK_ROWS) agar memori tidak melonjak untuk data setahun penuh.
+# Hasil (bytes) disimpan di st.cache_data dengan key versi data dan filter, jadi permintaan
+# berikutnya untuk data yang sama langsung memakai file yang sudah jadi.
+# Arsip presensi mentah (Parquet/CSV) diambil dari tabel fakta yang sudah ada di cache (tanpa membaca
+# ulang Google Sheets) dan ditulis per potongan ARCHIVE_CHUNK_ROWS; Parquet menjadi satu row group per
+# potongan, dengan kolom kategori sebagai dictionary. Karena bisa besar, bytes arsip disimpan di
+# st.cache_resource (tidak disalin di setiap rerun) dan hanya untuk beberapa permintaan terakhir.
+
+CHUNK_ROWS = 10000
+MAX_ENTRIES = 8
+ARCHIVE_CHUNK_ROWS = 100000
+ARCHIVE_COLUMNS = ["id", "tanggal", "pertemuan", "status_kehadiran", "mentee_id", "nama_mentee", "kelompok", "mentor_id", "nama_mentor"]
+ARCHIVE_FORMATS = {
+    "parquet": ("arsip_presensi.parquet", "application/vnd.apache.parquet"),
+    "csv": ("arsip_presensi.csv", "text/csv"),
+}
+RECAP_LABELS = {
+    'mentee_id': 'ID Mentee', 'nama': 'Nama Mentee', 'nama_mentor': 'Mentor',
+    'Hadir': 'Jml Hadir', 'Sakit': 'Jml Sakit', 'Izin': 'Jml Izin', 'Alfa': 'Jml Alfa', '% Hadir Murni': '% Hadir',
+}
+PRESENSI_LABELS = {
+    'id': 'ID', 'tanggal': 'Tanggal', 'pertemuan': 'Pertemuan', 'nama_mentee': 'Nama Mentee',
+    'kelompok': 'Kelompok', 'nama_mentor': 'Mentor', 'status_kehadiran': 'Status Kehadiran',
+}
+
+def _sheet_name(name, used):
+    # Batasan Excel: maksimal 31 karakter, tanpa []:*?/\, dan unik dalam satu workbook
+    base = re.sub(r"[\[\]:*?/\\]", "-", str(name)).strip() or "Sheet"
+    candidate, n = base[:31], 2
+    while candidate.lower() in used:
+        suffix = f" ({n})"
+        candidate, n = base[:31 - len(suffix)] + suffix, n + 1
+    used.add(candidate.lower())
+    return candidate
+
+def _python_values(column):
+    # Nilai Python biasa (int/str/datetime, None untuk kosong) ditulis xlsxwriter jauh lebih cepat
+    # daripada skalar NumPy/Timestamp
+    missing = column.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        values = pd.Series(column.dt.to_pydatetime(), dtype=object)
+    else:
+        values = column.astype(object).reset_index(drop=True)
+    return values.where(~missing, None).tolist()
+
+def _write_frame(workbook, name, df, formats, used):
+    worksheet = workbook.add_worksheet(_sheet_name(name, used))
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], formats["header"])
+    for col, dtype in enumerate(df.dtypes):
+        column_format = formats["date"] if pd.api.types.is_datetime64_any_dtype(dtype) else None
+        worksheet.set_column(col, col, 14 if column_format else 18, column_format)
+    worksheet.freeze_panes(1, 0)
+    for chunk_start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[chunk_start:chunk_start + CHUNK_ROWS]
+        columns = [_python_values(chunk.iloc[:, col]) for col in range(chunk.shape[1])] # NaN/NaT menjadi sel kosong
+        for offset, row in enumerate(zip(*columns), start=chunk_start + 1):
+            worksheet.write_row(offset, 0, row)
+
+def _meeting_summary(mentor_ids):
+    per_status = status_by_meeting(mentor_ids=mentor_ids)
+    if per_status.empty:
+        return pd.DataFrame(columns=["Pertemuan"] + STATUS_KEHADIRAN + ["Rata-rata Kehadiran (%)"])
+    summary = per_status.pivot_table(index="pertemuan", columns="status_kehadiran", values="Jumlah",
+                                     aggfunc="sum", fill_value=0, observed=True)
+    summary.columns = summary.columns.astype(str)
+    summary = summary.reindex(columns=STATUS_KEHADIRAN, fill_value=0).reset_index()
+    summary = summary.merge(attendance_by_meeting(mentor_ids=mentor_ids), on="pertemuan", how="left")
+    return summary.rename(columns={"pertemuan": "Pertemuan"})
+
+@st.cache_data(ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def _build_report(version, mentor_ids):
+    recap = mentee_recap(mentor_ids)
+    facts = get_facts() # Termasuk presensi tanpa tanggal, sama dengan hitungan di halaman Statistik
+    if mentor_ids is not None and 'mentor_id' in facts.columns:
+        facts = facts[facts['mentor_id'].isin(mentor_ids)]
+    presensi = facts[[col for col in PRESENSI_LABELS if col in facts.columns]].rename(columns=PRESENSI_LABELS)
+
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    formats = {
+        "header": workbook.add_format({"bold": True, "bg_color": "#DDEBF7", "border": 1}),
+        "date": workbook.add_format({"num_format": "yyyy-mm-dd"}),
+    }
+    used = set()
+    _write_frame(workbook, "Rekap Mentee", recap.rename(columns=RECAP_LABELS), formats, used)
+    _write_frame(workbook, "Ringkasan Pertemuan", _meeting_summary(mentor_ids), formats, used)
+    _write_frame(workbook, "Presensi", presensi, formats, used)
+    # Satu sheet rekap per mentor
+    if not recap.empty:
+        for nama_mentor, rows in recap.groupby(recap['nama_mentor'].fillna("Tanpa Mentor"), sort=True):
+            _write_frame(workbook, f"Mentor - {nama_mentor}", rows.drop(columns='nama_mentor').rename(columns=RECAP_LABELS),
+                         formats, used)
+    workbook.close()
+    return output.getvalue()
+
+def build_report(mentor_ids=None):
+    """
+    Workbook Excel (bytes) berisi sheet Rekap Mentee, Ringkasan Pertemuan, Presensi, dan satu sheet
+    per mentor untuk mentee milik `mentor_ids` (None = semua). Dibuat sekali per versi data dan filter.
+    """
+    version, _, _, mentor_ids = filter_key(None, None, mentor_ids)
+    return _build_report(version, mentor_ids)
+
+def archive_frame(start=None, end=None, mentor_ids=None):
+    """Tabel fakta presensi (ARCHIVE_COLUMNS) untuk rentang tanggal dan mentor; tanpa filter tanggal termasuk presensi tanpa tanggal."""
+    if start is None and end is None:
+        facts = get_facts()
+    else:
+        facts = get_facts_by_date().between(start, end)
+    if mentor_ids is not None and 'mentor_id' in facts.columns:
+        facts = facts[facts['mentor_id'].isin(mentor_ids)]
+    return facts[[col for col in ARCHIVE_COLUMNS if col in facts.columns]]
+
+def _chunks(frame):
+    for start in range(0, max(len(frame), 1), ARCHIVE_CHUNK_ROWS):
+        yield frame.iloc[start:start + ARCHIVE_CHUNK_ROWS]
+
+def _write_parquet(frame, output):
+    writer = None
+    for chunk in _chunks(frame):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(output, table.schema, compression="zstd")
+        writer.write_table(table)
+    writer.close()
+
+def _write_csv(frame, output):
+    for number, chunk in enumerate(_chunks(frame)):
+        output.write(chunk.to_csv(index=False, header=number == 0, date_format="%Y-%m-%d").encode("utf-8"))
+
+@st.cache_resource(ttl=DEFAULT_TTL, max_entries=2, show_spinner=False)
+def _build_archive(version, start, end, mentor_ids, fmt):
+    output = io.BytesIO()
+    frame = archive_frame(start, end, mentor_ids)
+    if fmt == "parquet":
+        _write_parquet(frame, output)
+    else:
+        _write_csv(frame, output)
+    return output.getvalue()
+
+def build_archive(fmt, start=None, end=None, mentor_ids=None):
+    """Arsip presensi mentah dalam format `fmt` ('parquet' atau 'csv') sebagai bytes; lihat ARCHIVE_FORMATS untuk nama file dan MIME."""
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"Format arsip tidak dikenal: {fmt}")
+    return _build_archive(*filter_key(start, end, mentor_ids), fmt)
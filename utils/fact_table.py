@@ -0,0 +1,147 @@
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.cache_versions import worksheet_version
+from utils.data_loader import DEFAULT_TTL, LOAD_GENERATION, frame_generation, load_frame, new_generation
+from utils.date_index import DateSortedFrame
+from utils.search_index import RowSearchIndex
+
+# Tabel fakta presensi yang sudah didenormalisasi.
+# Setiap baris presensi langsung membawa mentor_id (bertipe sama dengan kolom mentee.mentor_id)
+# serta nama_mentee, kelompok, dan nama_mentor (kategori), sehingga analisis per mentor/kelompok
+# dan tabel detail cukup satu filter/groupby tanpa merge presensi-mentee-mentor di setiap rerun.
+# Tabel dibangun ulang penuh jika isi kolom mentee/mentor yang digabung (LOOKUP_COLUMNS) berubah
+# atau data presensi dimuat ulang penuh (frame_generation berubah, mis. ada status yang diedit
+# di Sheets). Isi mentee/mentor dibandingkan lewat hash, sehingga frame yang dimuat ulang tiap
+# DEFAULT_TTL dengan isi yang sama tidak memicu pembangunan ulang; jika presensi hanya
+# bertambah, baris baru digabung lalu disambungkan. Seperti frame hasil load_frame(), tabel fakta
+# membawa frame_generation sendiri yang hanya berubah saat dibangun ulang penuh (dipakai utils.aggregates).
+
+FACT_COLUMNS = ["mentor_id", "nama_mentee", "kelompok", "nama_mentor"]
+NO_MENTOR = -1 # mentor_id untuk presensi yang mentee-nya sudah tidak terdaftar
+SEARCH_COLUMNS = ["nama_mentee", "status_kehadiran"]
+LOOKUP_COLUMNS = (["id", "mentor_id", "nama", "kelompok"], ["id", "nama"]) # Kolom mentee dan mentor yang dipakai join
+
+def _lookup_key(mentee, mentor):
+    """Hash isi kolom LOOKUP_COLUMNS; sama selama hasil _MenteeLookup(mentee, mentor) tidak berubah."""
+    digest = hashlib.blake2b(digest_size=16)
+    for df, columns in zip((mentee, mentor), LOOKUP_COLUMNS):
+        columns = [col for col in columns if col in df.columns]
+        digest.update(repr((columns, len(df))).encode())
+        if columns:
+            digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class _MenteeLookup:
+    """Kolom mentee/mentor per posisi mentee, untuk digabung ke presensi dengan get_indexer."""
+
+    def __init__(self, mentee, mentor):
+        mentee = mentee.drop_duplicates("id") if "id" in mentee.columns else mentee
+        self.index = pd.Index(mentee["id"] if "id" in mentee.columns else [])
+        mentor_id = mentee["mentor_id"] if "mentor_id" in mentee.columns else pd.Series(NO_MENTOR, index=mentee.index)
+        self.mentor_id = mentor_id.to_numpy()
+        names = {}
+        if not mentor.empty and "id" in mentor.columns:
+            names = mentor.drop_duplicates("id").set_index("id")["nama"].to_dict()
+        self.columns = {}
+        for col, values in (("nama_mentee", mentee.get("nama")), ("kelompok", mentee.get("kelompok")),
+                            ("nama_mentor", mentor_id.map(names))):
+            values = values.fillna("").astype(str) if values is not None else pd.Series("", index=mentee.index)
+            dtype = pd.CategoricalDtype(sorted(set(values) - {""})) # Nilai kosong menjadi NaN
+            self.columns[col] = (dtype, pd.Categorical(values, dtype=dtype).codes)
+
+    def join(self, rows):
+        positions = self.index.get_indexer(rows["mentee_id"])
+        found = positions >= 0
+        matched = positions[found] # Hanya posisi yang valid yang dibaca (lookup bisa kosong)
+        mentor_id = np.full(len(positions), NO_MENTOR, dtype=self.mentor_id.dtype)
+        mentor_id[found] = self.mentor_id[matched]
+        joined = {"mentor_id": mentor_id}
+        for col, (dtype, codes) in self.columns.items():
+            col_codes = np.full(len(positions), -1, dtype=codes.dtype) # -1 = NaN
+            col_codes[found] = codes[matched]
+            joined[col] = pd.Categorical.from_codes(col_codes, dtype=dtype)
+        return rows.assign(**joined)
+
+class AttendanceFacts:
+    """Tabel fakta yang dipakai bersama semua sesi; perbarui lewat refresh()."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sources = None # (presensi, mentee, mentor) terakhir yang sudah diproses
+        self.lookup = None
+        self.lookup_key = None # _lookup_key() mentee dan mentor yang dipakai self.lookup
+        self.generation = None # frame_generation() DataFrame presensi yang sudah diproses
+        self.facts = None
+
+    def _current_lookup_key(self, mentee, mentor):
+        if self.sources is not None and mentee is self.sources[1] and mentor is self.sources[2]:
+            return self.lookup_key
+        return _lookup_key(mentee, mentor)
+
+    def _is_append(self, presensi, lookup_key):
+        return (
+            self.lookup is not None
+            and lookup_key == self.lookup_key
+            and self.generation is not None
+            and frame_generation(presensi) == self.generation
+            and len(self.facts) <= len(presensi)
+        )
+
+    def refresh(self, presensi, mentee, mentor):
+        """Memperbarui tabel fakta sesuai DataFrame presensi, mentee, dan mentor terbaru lalu mengembalikannya."""
+        with self.lock:
+            sources = (presensi, mentee, mentor)
+            if self.sources is not None and all(a is b for a, b in zip(sources, self.sources)):
+                return self.facts
+            lookup_key = self._current_lookup_key(mentee, mentor)
+            if not {"id", "mentee_id"}.issubset(presensi.columns):
+                self.facts, self.lookup = presensi.copy(deep=False), None
+                self.facts.attrs[LOAD_GENERATION] = new_generation()
+            elif self._is_append(presensi, lookup_key):
+                if len(self.facts) == len(presensi):
+                    self.sources, self.lookup_key = sources, lookup_key
+                    return self.facts
+                new_rows = self.lookup.join(presensi.iloc[len(self.facts):])
+                facts = pd.concat([self.facts, new_rows], ignore_index=True)
+                facts.attrs = dict(self.facts.attrs)
+                self.facts = facts
+            else:
+                if self.lookup is None or lookup_key != self.lookup_key:
+                    self.lookup = _MenteeLookup(mentee, mentor)
+                self.facts = self.lookup.join(presensi)
+                self.facts.attrs[LOAD_GENERATION] = new_generation()
+            self.generation = frame_generation(presensi)
+            self.sources, self.lookup_key = sources, lookup_key
+            return self.facts
+
+@st.cache_resource
+def _get_store():
+    return AttendanceFacts()
+
+def get_facts():
+    """Tabel fakta presensi (kolom presensi + FACT_COLUMNS) sesuai data terbaru. Jangan diubah in-place."""
+    return _get_store().refresh(load_frame("presensi"), load_frame("mentee"), load_frame("mentor"))
+
+def _versions():
+    return tuple(worksheet_version(name) for name in ("presensi", "mentee", "mentor"))
+
+@st.cache_resource(ttl=DEFAULT_TTL, max_entries=2, show_spinner=False)
+def _facts_by_date(versions):
+    return DateSortedFrame(get_facts())
+
+@st.cache_resource(ttl=DEFAULT_TTL, max_entries=2, show_spinner=False)
+def _search_index(versions):
+    return RowSearchIndex(_facts_by_date(versions).frame, SEARCH_COLUMNS)
+
+def get_facts_by_date():
+    """Tabel fakta bertanggal valid, terurut menurut tanggal (utils.date_index) untuk filter rentang tanggal."""
+    return _facts_by_date(_versions())
+
+def get_search_index():
+    """Indeks pencarian (utils.search_index) atas nama mentee dan status; posisi barisnya mengacu ke get_facts_by_date().frame."""
+    return _search_index(_versions())
@@ -0,0 +1,28 @@
+import pandas as pd
+
+# Mode edit tabel (st.data_editor) untuk Data Mentor dan Data Mentee.
+# Saat disimpan, tabel hasil edit dibandingkan sel per sel dengan data asli; hanya sel yang
+# berubah yang dikirim, semuanya dalam satu job antrian (utils.write_queue.enqueue_updates).
+
+def _python_value(value):
+    # Nilai numpy (mis. int32 dari DataFrame) diubah ke tipe Python agar bisa disimpan sebagai JSON
+    value = value.item() if hasattr(value, "item") else value
+    return value.strip() if isinstance(value, str) else value
+
+def diff_edits(original, edited, columns, key="id"):
+    """
+    Membandingkan `edited` dengan `original` (baris dicocokkan lewat kolom `key`).
+    Mengembalikan (perubahan, kosong): `perubahan` adalah {ID: {kolom: nilai_baru}},
+    `kosong` adalah daftar ID yang sel wajibnya dikosongkan (tidak ikut disimpan).
+    """
+    before = original.set_index(key)[columns]
+    after = edited.set_index(key)[columns].reindex(before.index)
+    changed = before.astype(str).ne(after.astype(str))
+    changes, empty = {}, []
+    for record_id in changed.index[changed.any(axis=1)]:
+        values = {col: _python_value(after.at[record_id, col]) for col in columns if changed.at[record_id, col]}
+        if any(pd.isna(v) or v == "" for v in values.values()):
+            empty.append(_python_value(record_id))
+            continue
+        changes[_python_value(record_id)] = values
+    return changes, empty
@@ -0,0 +1,71 @@
+import pandas as pd
+
+from utils.sequence_utils import allocate_ids
+from utils.write_queue import enqueue_append
+
+# Impor massal mentor/mentee dari file CSV atau Excel.
+# Baris divalidasi dan dideduplikasi terhadap data yang sudah di-cache, lalu seluruh baris
+# yang lolos ditulis dengan satu append ber-ID berurutan lewat antrian tulis.
+
+IMPORT_COLUMNS = {
+    "mentor": ["nama", "email"],
+    "mentee": ["nama", "kelompok", "mentor_id"],
+}
+DEDUPE_KEYS = {"mentor": "email", "mentee": "nama"}
+
+def _normalize(value):
+    return " ".join(str(value).split()).lower()
+
+def read_upload(uploaded_file):
+    """Membaca file unggahan (.csv atau .xlsx) sebagai DataFrame teks dengan nama kolom yang dinormalisasi."""
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        df = pd.read_excel(uploaded_file, dtype=str)
+    else:
+        # sep=None: pemisah koma maupun titik koma (CSV dari Excel berbahasa Indonesia) dikenali otomatis
+        df = pd.read_csv(uploaded_file, dtype=str, sep=None, engine="python", keep_default_na=False)
+    df.columns = [str(col).strip().lower().replace(" ", "_") for col in df.columns]
+    return df.fillna("")
+
+def prepare_import(ws_name, df, existing, mentor_ids=()):
+    """
+    Memvalidasi baris impor untuk worksheet `ws_name` ('mentor' atau 'mentee').
+    Mengembalikan (valid, ditolak): `valid` berisi kolom IMPORT_COLUMNS yang siap ditulis,
+    `ditolak` berisi baris asli ditambah kolom 'alasan'.
+    Melempar ValueError jika kolom wajib tidak ada.
+    """
+    missing = [col for col in IMPORT_COLUMNS[ws_name] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+    data = df[IMPORT_COLUMNS[ws_name]].apply(lambda col: col.astype(str).str.strip())
+    reasons = pd.Series("", index=data.index)
+
+    def reject(mask, reason):
+        reasons[mask & (reasons == "")] = reason
+
+    reject((data == "").any(axis=1), "Kolom wajib kosong")
+    if ws_name == "mentor":
+        reject(~data["email"].str.contains("@", regex=False), "Format email tidak valid")
+    if ws_name == "mentee":
+        mentor_id = pd.to_numeric(data["mentor_id"], errors='coerce')
+        reject(~mentor_id.isin(list(mentor_ids)), "mentor_id tidak terdaftar")
+        data["mentor_id"] = mentor_id.fillna(0).astype(int)
+
+    key = DEDUPE_KEYS[ws_name]
+    normalized = data[key].map(_normalize)
+    existing_keys = set(existing[key].map(_normalize)) if key in existing.columns else set()
+    reject(normalized.isin(existing_keys), f"{key} sudah terdaftar")
+    reject(normalized.where(reasons == "").duplicated() & normalized.notna(), f"{key} ganda di dalam file")
+
+    valid = data[reasons == ""]
+    rejected = df[reasons != ""].assign(alasan=reasons[reasons != ""])
+    return valid, rejected
+
+def import_rows(ws_name, valid):
+    """Menulis baris yang sudah divalidasi dengan satu append dan satu blok ID berurutan. Mengembalikan jumlah baris."""
+    if valid.empty:
+        return 0
+    ids = allocate_ids(ws_name, len(valid))
+    rows = [[record_id, *values] for record_id, values in zip(ids, valid[IMPORT_COLUMNS[ws_name]].values.tolist())]
+    enqueue_append(ws_name, rows)
+    return len(rows)
@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import streamlit as st
+
+from utils.config_utils import get_bool_setting, get_float_setting, get_setting
+from utils.delta_utils import fetch_delta
+from utils.rate_limiter import PRIORITY_BACKGROUND, request_priority
+from utils.sheets_utils import WORKSHEET_HEADERS, WORKSHEET_NAMES, get_worksheet
+
+# Cermin (mirror) lokal SQLite untuk worksheet mentor, mentee, dan presensi.
+# Aktifkan dengan `local_store = true` di .streamlit/secrets.toml (atau env BKPK_LOCAL_STORE=1).
+# Sebuah thread latar belakang menyinkronkan data dari Google Sheets secara berkala,
+# sehingga halaman cukup membaca SQLite lokal tanpa tergantung latensi dan kuota API.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/bkpk_mirror.sqlite3"
+DEFAULT_SYNC_INTERVAL = 60 # detik
+
+TABLE_COLUMNS = WORKSHEET_HEADERS
+INTEGER_COLUMNS = {"id", "mentor_id", "mentee_id", "pertemuan"}
+INDEXED_COLUMNS = {
+    "mentee": ["mentor_id"],
+    "presensi": ["mentee_id", "tanggal", "pertemuan"],
+}
+# presensi praktis hanya ditambah (append-only), sehingga cukup dibaca baris barunya
+# (baik untuk mirror SQLite maupun saat membaca langsung dari Sheets, lihat read_delta())
+INCREMENTAL_TABLES = {"presensi"}
+
+def is_enabled():
+    """True jika mirror SQLite lokal diaktifkan lewat konfigurasi."""
+    return get_bool_setting("local_store", False)
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL") # Pembaca tidak terblokir saat sinkronisasi menulis
+    return conn
+
+def _init_db(db_path):
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with closing(_connect(db_path)) as conn, conn:
+        for name, columns in TABLE_COLUMNS.items():
+            column_defs = ", ".join(f"{col} {'INTEGER' if col in INTEGER_COLUMNS else 'TEXT'}" for col in columns)
+            # sheet_row = nomor baris fisik di Google Sheets (baris 1 adalah header)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (sheet_row INTEGER PRIMARY KEY, {column_defs})")
+            for col in INDEXED_COLUMNS.get(name, []):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_{col} ON {name} ({col})")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_meta ("
+            "worksheet TEXT PRIMARY KEY, header TEXT, sheet_rows INTEGER, synced_at REAL)"
+        )
+        # Posisi baca terakhir untuk sinkronisasi delta (lihat utils.delta_utils)
+        conn.execute("CREATE TABLE IF NOT EXISTS delta_state (worksheet TEXT PRIMARY KEY, state TEXT)")
+
+def _to_records(name, header, rows, first_row):
+    """Mengubah baris mentah sheet menjadi tuple (sheet_row, kolom...) sesuai TABLE_COLUMNS."""
+    positions = {col: i for i, col in enumerate(header)}
+    for offset, row in enumerate(rows):
+        # Baris kosong tetap disimpan agar urutan baris sama dengan get_all_records()
+        values = []
+        for col in TABLE_COLUMNS[name]:
+            i = positions.get(col)
+            values.append(row[i] if i is not None and i < len(row) and row[i] != "" else None)
+        yield (first_row + offset, *values)
+
+def _insert(conn, name, records):
+    columns = ["sheet_row"] + TABLE_COLUMNS[name]
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(f"INSERT OR REPLACE INTO {name} ({', '.join(columns)}) VALUES ({placeholders})", records)
+
+def _save_meta(conn, name, header, sheet_rows):
+    conn.execute(
+        "INSERT OR REPLACE INTO sync_meta (worksheet, header, sheet_rows, synced_at) VALUES (?, ?, ?, ?)",
+        (name, "\t".join(header), sheet_rows, time.time()),
+    )
+
+def _sync_full(conn, name, ws):
+    values = ws.get_all_values()
+    header, rows = (values[0], values[1:]) if values else ([], [])
+    conn.execute(f"DELETE FROM {name}")
+    _insert(conn, name, _to_records(name, header, rows, first_row=2))
+    _save_meta(conn, name, header, len(values))
+
+def _sync_incremental(conn, name, ws):
+    row = conn.execute("SELECT state FROM delta_state WHERE worksheet = ?", (name,)).fetchone()
+    mode, rows, state = fetch_delta(ws, json.loads(row[0]) if row else None)
+    if mode == "full":
+        conn.execute(f"DELETE FROM {name}")
+        _insert(conn, name, _to_records(name, state["header"], rows[1:], first_row=2))
+    elif rows:
+        first_row = state["row_count"] - len(rows) + 1
+        _insert(conn, name, _to_records(name, state["header"], rows, first_row=first_row))
+    conn.execute("INSERT OR REPLACE INTO delta_state (worksheet, state) VALUES (?, ?)", (name, json.dumps(state)))
+    _save_meta(conn, name, state["header"], state["row_count"])
+
+class _SyncWorker:
+    """Menjalankan sinkronisasi Sheets -> SQLite secara berkala di thread latar belakang."""
+
+    def __init__(self, db_path, worksheets, interval):
+        self.db_path = db_path
+        self.worksheets = worksheets
+        self.interval = interval
+        self.lock = threading.Lock() # Satu sinkronisasi dalam satu waktu
+        self.wake_up = threading.Event()
+        self.last_sync = None
+        self.last_error = None
+
+    def sync(self, names=WORKSHEET_NAMES):
+        with self.lock, closing(_connect(self.db_path)) as conn:
+            for name in names:
+                with conn: # Satu transaksi per worksheet
+                    if name in INCREMENTAL_TABLES:
+                        _sync_incremental(conn, name, self.worksheets[name])
+                    else:
+                        _sync_full(conn, name, self.worksheets[name])
+            self.last_sync = time.time()
+
+    def run(self):
+        # Sinkronisasi berkala mengalah pada pembacaan halaman dan penulisan di penjadwal kuota
+        with request_priority(PRIORITY_BACKGROUND):
+            while True:
+                self.wake_up.wait(self.interval)
+                self.wake_up.clear()
+                try:
+                    self.sync()
+                    self.last_error = None
+                except Exception as e: # Jangan hentikan thread karena error sementara
+                    self.last_error = str(e)
+                    logger.warning("Sinkronisasi mirror SQLite gagal: %s", e)
+
+@st.cache_resource
+def get_sync_worker():
+    db_path = get_setting("local_store_path", DEFAULT_DB_PATH)
+    _init_db(db_path)
+    # Handle worksheet diambil di thread skrip; thread latar belakang tidak memanggil API Streamlit
+    worksheets = {name: get_worksheet(name) for name in WORKSHEET_NAMES}
+    worker = _SyncWorker(db_path, worksheets, get_float_setting("local_store_sync_interval", DEFAULT_SYNC_INTERVAL))
+    worker.sync() # Sinkronisasi awal agar halaman pertama langsung mendapat data
+    threading.Thread(target=worker.run, name="bkpk-local-store-sync", daemon=True).start()
+    return worker
+
+def read_delta(name, since=None):
+    """
+    Membaca worksheet append-only (INCREMENTAL_TABLES) secara bertahap untuk utils.data_loader.
+    `since` adalah penanda dari pembacaan sebelumnya (None untuk pembacaan pertama).
+    Mengembalikan (mode, header, rows, penanda_baru):
+    - mode "full"   : `rows` adalah seluruh baris data
+    - mode "append" : `rows` hanya baris data baru sejak `since` (bisa kosong)
+    """
+    if not is_enabled():
+        mode, rows, state = fetch_delta(get_worksheet(name), since)
+        if mode == "full":
+            return mode, (rows[0] if rows else []), rows[1:], state
+        return mode, state["header"], rows, state
+
+    # Mirror aktif: penanda adalah posisi sinkronisasi delta terakhir di SQLite. Selama sinkronisasi
+    # belum memuat ulang penuh (full_loaded_at sama), baris setelah `row_count` adalah baris baru.
+    worker = get_sync_worker()
+    columns = TABLE_COLUMNS[name]
+    query = f"SELECT {', '.join(columns)} FROM {name}"
+    with closing(_connect(worker.db_path)) as conn:
+        conn.execute("BEGIN") # Posisi sinkronisasi dan baris dibaca dari snapshot yang sama
+        row = conn.execute("SELECT state FROM delta_state WHERE worksheet = ?", (name,)).fetchone()
+        state = json.loads(row[0]) if row else {}
+        position = {"full_loaded_at": state.get("full_loaded_at"), "row_count": state.get("row_count", 1)}
+        appended = (
+            since is not None
+            and position["full_loaded_at"] is not None
+            and since["full_loaded_at"] == position["full_loaded_at"]
+            and since["row_count"] <= position["row_count"]
+        )
+        if appended:
+            rows = conn.execute(query + " WHERE sheet_row > ? ORDER BY sheet_row", (since["row_count"],)).fetchall()
+            return "append", list(columns), rows, position
+        return "full", list(columns), conn.execute(query + " ORDER BY sheet_row").fetchall(), position
+
+def _matches(value, expected, integer):
+    if integer:
+        try:
+            return int(float(value)) == int(expected)
+        except (TypeError, ValueError):
+            return False
+    return value == expected
+
+def read_values(name, filters=None):
+    """
+    Membaca isi mentah worksheet sebagai (header, rows) untuk dibangun menjadi DataFrame
+    bertipe oleh utils.schema.build_frame().
+    Jika mirror aktif data dibaca dari SQLite lokal, jika tidak langsung dari Google Sheets.
+    `filters` adalah dict {kolom: nilai} untuk memfilter baris dengan kesamaan nilai.
+    """
+    filters = filters or {}
+    if not is_enabled():
+        values = get_worksheet(name).get_all_values()
+        if not values:
+            return [], []
+        header, rows = values[0], values[1:]
+        for col, value in filters.items():
+            if col in header:
+                i = header.index(col)
+                rows = [r for r in rows if _matches(r[i] if i < len(r) else "", value, col in INTEGER_COLUMNS)]
+        return header, rows
+
+    worker = get_sync_worker()
+    columns = TABLE_COLUMNS[name]
+    query = f"SELECT {', '.join(columns)} FROM {name}"
+    params = []
+    if filters:
+        query += " WHERE " + " AND ".join(f"{col} = ?" for col in filters)
+        params = [int(v) if col in INTEGER_COLUMNS else v for col, v in filters.items()]
+    query += " ORDER BY sheet_row"
+    with closing(_connect(worker.db_path)) as conn:
+        return list(columns), conn.execute(query, params).fetchall()
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from utils.cache_versions import worksheet_version
+from utils.data_loader import load_frame
+from utils.schema import build_frame
+from utils.sheets_utils import get_worksheet
+
+# Indeks login mentor: email (dinormalisasi, tidak peka huruf besar/kecil) -> (id, nama).
+# Indeks dibangun sekali per versi worksheet mentor dan dipakai bersama semua sesi,
+# sehingga setiap percobaan login cukup satu lookup dict (O(1)) alih-alih memindai DataFrame.
+# Jika email tidak ditemukan, worksheet mentor dibaca ulang langsung dari Google Sheets (paling sering
+# sekali per MISS_REFRESH_INTERVAL) agar mentor yang baru ditambahkan langsung bisa login.
+# Pembacaan ulang ini hanya memperbarui indeks login (lewat nomor `generation` sendiri), tanpa
+# menaikkan versi worksheet mentor sehingga cache lain tidak ikut dihitung ulang.
+
+MISS_REFRESH_INTERVAL = 30 # detik
+LATENCY_SAMPLES = 500 # Jumlah pengukuran terakhir yang disimpan untuk statistik
+
+def normalize_email(email):
+    return str(email or "").strip().lower()
+
+def _read_mentors():
+    # Dibaca langsung dari Sheets (bukan mirror SQLite yang mungkin belum tersinkron)
+    values = get_worksheet("mentor").get_all_values()
+    header, rows = (values[0], values[1:]) if values else ([], [])
+    return build_frame("mentor", header, rows)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _build_index(mentor_version, generation):
+    df = _read_mentors() if generation else load_frame("mentor")
+    index = {}
+    if df.empty or 'email' not in df.columns:
+        return index
+    for mentor_id, nama, email in zip(df['id'].tolist(), df['nama'], df['email']):
+        key = normalize_email(email)
+        if key and key not in index: # Jika email ganda, baris pertama yang dipakai
+            index[key] = (mentor_id, nama)
+    return index
+
+@st.cache_resource
+def _get_login_stats():
+    return {
+        "lock": threading.Lock(),
+        "latencies": deque(maxlen=LATENCY_SAMPLES),
+        "attempts": 0,
+        "misses": 0,
+        "refreshes": 0,
+        "last_refresh": 0.0,
+        "generation": 0, # Naik setiap indeks dibaca ulang karena email tidak ditemukan
+        "generation_version": None, # Versi worksheet mentor saat `generation` terakhir naik
+    }
+
+def get_login_index():
+    """Indeks login untuk versi worksheet mentor saat ini (dibangun jika belum ada)."""
+    stats = _get_login_stats()
+    version = worksheet_version("mentor")
+    with stats["lock"]:
+        generation = stats["generation"] if stats["generation_version"] == version else 0
+    return _build_index(version, generation)
+
+def lookup_mentor(email):
+    """Mencari mentor berdasarkan email. Mengembalikan (id, nama) atau None jika tidak ditemukan."""
+    started = time.perf_counter()
+    stats = _get_login_stats()
+    key = normalize_email(email)
+    match = get_login_index().get(key)
+    if match is None and key:
+        with stats["lock"]:
+            refresh = time.time() - stats["last_refresh"] >= MISS_REFRESH_INTERVAL
+            if refresh:
+                stats["last_refresh"] = time.time()
+                stats["refreshes"] += 1
+                stats["generation"] += 1
+                stats["generation_version"] = worksheet_version("mentor")
+        if refresh:
+            match = get_login_index().get(key)
+    with stats["lock"]:
+        stats["attempts"] += 1
+        stats["misses"] += match is None
+        stats["latencies"].append(time.perf_counter() - started)
+    return match
+
+def login_stats():
+    """Statistik login mentor: jumlah percobaan, gagal, baca ulang, dan latensi (ms) p50/p95/maks."""
+    stats = _get_login_stats()
+    with stats["lock"]:
+        latencies = sorted(stats["latencies"])
+        result = {key: stats[key] for key in ("attempts", "misses", "refreshes")}
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+    result.update(p50_ms=percentile(0.5), p95_ms=percentile(0.95), max_ms=latencies[-1] * 1000 if latencies else 0.0)
+    return result
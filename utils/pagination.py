@@ -0,0 +1,55 @@
+import math
+
+import pandas as pd
+import streamlit as st
+
+# Komponen tabel berhalaman untuk tabel besar (presensi, data mentor/mentee).
+# Hanya baris di halaman yang terlihat yang dikirim ke browser dan diberi gaya, sehingga ukuran
+# payload dan waktu serialisasi Arrow tidak bergantung pada panjang riwayat presensi.
+# Ukuran halaman, kolom urut, dan nomor halaman disimpan di session_state per `key`.
+# Tanpa kolom urut, satu halaman cukup satu potongan iloc; pengurutan hanya menghitung urutan
+# posisi satu kolom lalu mengambil posisi untuk halaman itu.
+
+PAGE_SIZES = [25, 50, 100, 250]
+NO_SORT = "(urutan asli)"
+
+def _sort_order(df, column, descending):
+    """Posisi baris (iloc) terurut menurut `column` (kolom atau nama indeks); nilai kosong di akhir."""
+    values = pd.Series(df.index if column == df.index.name else df[column].to_numpy())
+    return values.sort_values(ascending=not descending, kind="stable", na_position="last").index.to_numpy()
+
+def _reset_page(key):
+    st.session_state[f"{key}_page"] = 1
+
+def paginated_dataframe(df, key, format_page=None, page_sizes=PAGE_SIZES, **dataframe_kwargs):
+    """
+    Menampilkan `df` per halaman dengan kontrol urutan, ukuran halaman, dan nomor halaman.
+    `format_page` (opsional) menerima DataFrame satu halaman dan mengembalikan DataFrame/Styler
+    yang akan ditampilkan, misalnya untuk menambah kolom tampilan atau pemformatan kondisional.
+    """
+    sort_options = [NO_SORT] + ([df.index.name] if df.index.name else []) + list(df.columns)
+    col_sort, col_dir, col_size, col_page = st.columns([2, 1, 1, 1])
+    with col_sort:
+        sort_column = st.selectbox("Urutkan berdasarkan", sort_options, key=f"{key}_sort",
+                                   on_change=_reset_page, args=(key,))
+    with col_dir:
+        descending = st.selectbox("Arah", ["Naik", "Turun"], key=f"{key}_desc",
+                                  on_change=_reset_page, args=(key,)) == "Turun"
+    with col_size:
+        page_size = st.selectbox("Baris per halaman", page_sizes, key=f"{key}_size",
+                                 on_change=_reset_page, args=(key,))
+    total_pages = max(1, math.ceil(len(df) / page_size))
+    # Nomor halaman disesuaikan jika data menyusut (misalnya setelah filter/pencarian berubah)
+    if st.session_state.get(f"{key}_page", 1) > total_pages:
+        st.session_state[f"{key}_page"] = total_pages
+    with col_page:
+        page = st.number_input("Halaman", min_value=1, max_value=total_pages, step=1, key=f"{key}_page")
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(df))
+    if sort_column == NO_SORT or sort_column is None:
+        page_df = df.iloc[start:stop]
+    else:
+        page_df = df.iloc[_sort_order(df, sort_column, descending)[start:stop]]
+    st.dataframe(format_page(page_df) if format_page else page_df, **dataframe_kwargs)
+    st.caption(f"Menampilkan baris {start + 1 if len(df) else 0}-{stop} dari {len(df)} (halaman {page} dari {total_pages}).")
@@ -0,0 +1,171 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+# Penjadwal panggilan Google Sheets API untuk seluruh proses.
+# - Token bucket terpisah untuk baca dan tulis agar kuota per menit tidak terlampaui;
+#   panggilan berlebih menunggu giliran alih-alih gagal dengan error 429.
+# - Antrian berprioritas per bucket: angka lebih kecil dilayani lebih dulu.
+# - Single-flight: pembacaan identik yang sedang berjalan tidak diulang, pemanggil lain
+#   cukup menunggu hasil panggilan yang sama. Key penggabungan menyertakan generasi tulis, sehingga
+#   pembacaan yang diminta setelah sebuah tulis selesai tidak ikut memakai hasil pembacaan yang
+#   dimulai sebelum tulis tersebut (hasilnya bisa belum memuat perubahan).
+
+PRIORITY_WRITE = 0 # Antrian tulis (termasuk presensi) dan pembacaan yang dibutuhkannya
+PRIORITY_INTERACTIVE = 1 # Pembacaan yang ditunggu langsung oleh form (mis. daftar mentee saat presensi)
+PRIORITY_READ = 2 # Pembacaan halaman biasa (dashboard, statistik)
+PRIORITY_BACKGROUND = 3 # Sinkronisasi latar belakang
+
+READ_METHODS = {"get_all_records", "get_all_values", "get_values", "get", "col_values", "row_values", "acell", "cell"}
+WRITE_METHODS = {"append_row", "append_rows", "update", "update_cell", "batch_update", "delete_rows", "insert_row", "insert_rows", "clear"}
+
+_context = threading.local()
+
+@contextmanager
+def request_priority(priority):
+    """Mengatur prioritas semua panggilan Sheets di thread ini selama blok `with`."""
+    previous = getattr(_context, "priority", None)
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+def current_priority(default):
+    priority = getattr(_context, "priority", None)
+    return default if priority is None else priority
+
+class TokenBucket:
+    """Token bucket sederhana: `rate_per_minute` token per menit, maksimal `capacity` token tersimpan."""
+
+    def __init__(self, rate_per_minute, capacity):
+        self.rate = rate_per_minute / 60.0 # token per detik
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self):
+        """Detik sampai satu token tersedia (0 jika sudah tersedia)."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SheetsScheduler:
+    """Mengatur laju, prioritas, dan penggabungan (single-flight) panggilan Sheets API."""
+
+    def __init__(self, read_per_minute, write_per_minute, burst):
+        self.cond = threading.Condition()
+        self.buckets = {"read": TokenBucket(read_per_minute, burst), "write": TokenBucket(write_per_minute, burst)}
+        self.waiting = {"read": [], "write": []} # heap (prioritas, nomor urut)
+        self.sequence = itertools.count()
+        self.flights_lock = threading.Lock()
+        self.flights = {}
+        self.write_generation = 0 # Bertambah setiap kali panggilan tulis selesai (berhasil maupun gagal)
+        self.stats = {"read": 0, "write": 0, "collapsed": 0, "waited_seconds": 0.0}
+
+    def _acquire(self, kind, priority):
+        ticket = (priority, next(self.sequence))
+        started = time.monotonic()
+        with self.cond:
+            heapq.heappush(self.waiting[kind], ticket)
+            self.cond.notify_all() # Pemegang antrian teratas perlu mengevaluasi ulang
+            try:
+                while True:
+                    if self.waiting[kind][0] == ticket:
+                        wait = self.buckets[kind].wait_time()
+                        if wait <= 0:
+                            self.buckets[kind].consume()
+                            heapq.heappop(self.waiting[kind])
+                            self.stats[kind] += 1
+                            self.stats["waited_seconds"] += time.monotonic() - started
+                            self.cond.notify_all()
+                            return
+                        self.cond.wait(wait)
+                    else:
+                        self.cond.wait()
+            except BaseException:
+                if ticket in self.waiting[kind]:
+                    self.waiting[kind].remove(ticket)
+                    heapq.heapify(self.waiting[kind])
+                    self.cond.notify_all()
+                raise
+
+    def run(self, kind, fn, *args, priority=None, key=None, **kwargs):
+        """Menjalankan `fn(*args, **kwargs)` setelah mendapat token dari bucket `kind` ('read'/'write')."""
+        if priority is None:
+            priority = current_priority(PRIORITY_WRITE if kind == "write" else PRIORITY_READ)
+        if kind == "write":
+            self._acquire(kind, priority)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.flights_lock:
+                    self.write_generation += 1
+        if key is None:
+            self._acquire(kind, priority)
+            return fn(*args, **kwargs)
+
+        with self.flights_lock:
+            key = (self.write_generation, key)
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+            else:
+                self.stats["collapsed"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            self._acquire(kind, priority)
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.flights_lock:
+                self.flights.pop(key, None)
+            flight.done.set()
+
+class ScheduledWorksheet:
+    """
+    Pembungkus worksheet gspread: setiap panggilan baca/tulis melewati SheetsScheduler.
+    Bisa juga membungkus Spreadsheet untuk panggilan level spreadsheet seperti batch_update.
+    """
+
+    def __init__(self, worksheet, scheduler):
+        self._worksheet = worksheet
+        self._scheduler = scheduler
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if name in READ_METHODS:
+            def scheduled_read(*args, **kwargs):
+                key = (self._worksheet.id, name, repr(args), repr(sorted(kwargs.items())))
+                return self._scheduler.run("read", attr, *args, key=key, **kwargs)
+            return scheduled_read
+        if name in WRITE_METHODS:
+            def scheduled_write(*args, **kwargs):
+                return self._scheduler.run("write", attr, *args, **kwargs)
+            return scheduled_write
+        return attr
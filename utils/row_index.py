@@ -0,0 +1,81 @@
+import bisect
+import re
+import time
+
+# Indeks ID -> nomor baris fisik untuk satu worksheet, dirawat oleh antrian tulis.
+# Kolom ID hanya dibaca saat indeks belum ada, sudah terlalu lama, atau ID yang dicari tidak ditemukan.
+# Selebihnya indeks diperbarui sendiri dari perubahan struktur yang dilakukan aplikasi:
+# - append: nomor baris diambil dari `updatedRange` pada respons API (jika tidak ada, indeks dibuang)
+# - delete: baris di bawah baris yang dihapus digeser ke atas
+# Perubahan struktur langsung di Google Sheets tertangkap paling lambat setelah `max_age`.
+
+DEFAULT_MAX_AGE = 300 # detik
+
+_UPDATED_RANGE = re.compile(r"(?:^|!)\$?[A-Z]+\$?(\d+)")
+
+def _first_appended_row(response):
+    """Nomor baris pertama yang ditulis append_rows(), atau None jika tidak bisa diketahui."""
+    if not isinstance(response, dict):
+        return None
+    updated_range = response.get("updates", {}).get("updatedRange", "")
+    match = _UPDATED_RANGE.search(updated_range)
+    return int(match.group(1)) if match else None
+
+class RowIndex:
+    """Peta ID (teks) -> nomor baris fisik pada satu worksheet (baris 1 adalah header)."""
+
+    def __init__(self, ws, max_age=DEFAULT_MAX_AGE):
+        self.ws = ws
+        self.max_age = max_age
+        self.positions = None
+        self.loaded_at = 0.0
+
+    def refresh(self):
+        values = self.ws.col_values(1)
+        self.positions = {
+            str(value).strip(): row
+            for row, value in enumerate(values, start=1)
+            if row > 1 and str(value).strip()
+        }
+        self.loaded_at = time.monotonic()
+        return self.positions
+
+    def invalidate(self):
+        self.positions = None
+
+    def _is_fresh(self):
+        return self.positions is not None and time.monotonic() - self.loaded_at <= self.max_age
+
+    def lookup(self, ids):
+        """Mengembalikan {id: baris} untuk ID yang ditemukan. Kolom ID dibaca ulang sekali jika ada yang hilang."""
+        ids = [str(record_id) for record_id in ids]
+        refreshed = not self._is_fresh()
+        if refreshed:
+            self.refresh()
+        if not refreshed and any(record_id not in self.positions for record_id in ids):
+            self.refresh() # Bisa jadi baris ditambahkan/digeser di luar aplikasi
+        return {record_id: self.positions[record_id] for record_id in ids if record_id in self.positions}
+
+    def appended(self, ids, response):
+        """Mencatat baris yang baru saja ditambahkan dengan append_rows()."""
+        first_row = _first_appended_row(response)
+        if self.positions is None:
+            return
+        if first_row is None:
+            self.invalidate()
+            return
+        for offset, record_id in enumerate(ids):
+            self.positions[str(record_id)] = first_row + offset
+
+    def deleted(self, rows):
+        """Mencatat baris fisik yang baru saja dihapus dan menggeser baris di bawahnya."""
+        if self.positions is None or not rows:
+            return
+        deleted_rows = sorted(rows)
+        removed = set(deleted_rows)
+        # Baris turun sebanyak jumlah baris terhapus di atasnya
+        self.positions = {
+            record_id: row - bisect.bisect_left(deleted_rows, row)
+            for record_id, row in self.positions.items()
+            if row not in removed
+        }
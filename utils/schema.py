@@ -0,0 +1,90 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Definisi skema pusat untuk setiap worksheet.
+# Urutan kolom di sini adalah urutan kolom di Google Sheets (dipakai juga oleh setup_sheets.py),
+# sedangkan nilainya menentukan tipe data di DataFrame hasil build_frame().
+
+STATUS_KEHADIRAN = ["Hadir", "Sakit", "Izin", "Alfa"]
+TANGGAL_FORMAT = "%Y-%m-%d" # Format tanggal yang ditulis oleh form presensi
+
+SCHEMAS = {
+    "mentor": {"id": "int32", "nama": "text", "email": "text"},
+    "mentee": {"id": "int32", "nama": "text", "kelompok": "text", "mentor_id": "int32"},
+    "presensi": {
+        "id": "int32",
+        "mentee_id": "int32",
+        "tanggal": "date",
+        "pertemuan": "int16",
+        "status_kehadiran": "status",
+    },
+}
+INTEGER_TYPES = {"int16", "int32"}
+
+logger = logging.getLogger(__name__)
+
+def _integer_column(name, col, values, kind):
+    numbers = pd.to_numeric(values, errors='coerce')
+    # Nilai di luar jangkauan int64 (atau tak hingga) tidak bisa disimpan sebagai bilangan bulat
+    invalid = numbers.notna() & ~numbers.between(np.iinfo("int64").min, np.iinfo("int64").max)
+    if invalid.any():
+        logger.warning("%d nilai kolom '%s' di worksheet '%s' terlalu besar dan diganti 0", int(invalid.sum()), col, name)
+        numbers = numbers.mask(invalid)
+    numbers = numbers.fillna(0)
+    info = np.iinfo(kind)
+    if numbers.between(info.min, info.max).all():
+        return numbers.astype(kind)
+    # Tipe ringkas akan memotong (wrap) nilai yang tidak muat, jadi kolom dibiarkan int64
+    logger.warning("Kolom '%s' di worksheet '%s' berisi nilai di luar jangkauan %s, disimpan sebagai int64", col, name, kind)
+    return numbers.astype("int64")
+
+def _status_column(values):
+    values = values.fillna("").astype(str).str.strip()
+    # Status di luar daftar baku tetap dipertahankan sebagai kategori tambahan
+    extra = sorted(set(values.unique()) - set(STATUS_KEHADIRAN) - {""})
+    return pd.Categorical(values, categories=STATUS_KEHADIRAN + extra)
+
+def build_frame(name, header, rows):
+    """
+    Membangun DataFrame bertipe dari nilai mentah worksheet (header + baris).
+    ID menjadi int32, pertemuan int16 (int64 jika ada nilai yang tidak muat), tanggal datetime64 (format tetap TANGGAL_FORMAT),
+    status_kehadiran kategori dengan kolom boolean tambahan `is_hadir`.
+    Kolom yang tidak ada di sheet tidak ditambahkan.
+    """
+    if not header:
+        return pd.DataFrame()
+    width = len(header)
+    df = pd.DataFrame([(list(row) + [""] * width)[:width] for row in rows], columns=header)
+    for col, kind in SCHEMAS[name].items():
+        if col not in df.columns:
+            continue
+        if kind in INTEGER_TYPES:
+            df[col] = _integer_column(name, col, df[col], kind)
+        elif kind == "date":
+            df[col] = pd.to_datetime(df[col].astype(str), format=TANGGAL_FORMAT, errors='coerce')
+        elif kind == "status":
+            df[col] = _status_column(df[col])
+            df["is_hadir"] = (df[col] == "Hadir").to_numpy(dtype=bool)
+        else:
+            df[col] = df[col].fillna("").astype(str)
+    return df
+
+def append_frame(frame, new_rows):
+    """
+    Menyambung `new_rows` (hasil build_frame untuk worksheet yang sama) di belakang `frame`.
+    Kategori status yang baru muncul ditambahkan di akhir sehingga kode kategori lama tetap berlaku.
+    """
+    if new_rows.empty:
+        return frame
+    frame, new_rows = frame.copy(deep=False), new_rows.copy(deep=False)
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype) and col in new_rows.columns:
+            known = list(frame[col].cat.categories)
+            categories = known + [c for c in new_rows[col].cat.categories if c not in set(known)]
+            frame[col] = frame[col].cat.set_categories(categories)
+            new_rows[col] = new_rows[col].cat.set_categories(categories)
+    combined = pd.concat([frame, new_rows], ignore_index=True)
+    combined.attrs = dict(frame.attrs)
+    return combined
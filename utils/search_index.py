@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Indeks pencarian untuk kotak "Cari di Presensi" di Dashboard admin.
+# Kolom teks di tabel fakta (nama mentee, status) bertipe kategori, jadi pencarian dilakukan pada
+# kosakata kategorinya (jauh lebih kecil dari jumlah baris) lewat indeks trigram, lalu kode kategori
+# yang cocok diterjemahkan ke posisi baris lewat posting list yang terurut. Posting list dipotong
+# dengan searchsorted sehingga rentang tanggal (utils.date_index) ikut diterapkan tanpa memindai baris.
+# Pencocokan berupa substring tanpa membedakan huruf besar/kecil.
+
+NGRAM = 3
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+class SubstringIndex:
+    """Indeks trigram atas daftar string untuk mencari string yang memuat suatu substring."""
+
+    def __init__(self, values):
+        self.values = [str(value).casefold() for value in values]
+        grams = {}
+        for position, value in enumerate(self.values):
+            for gram in _ngrams(value):
+                grams.setdefault(gram, []).append(position)
+        self.grams = {gram: np.array(positions, dtype=np.int64) for gram, positions in grams.items()}
+
+    def matching(self, query):
+        """Posisi string (terurut) yang memuat `query`."""
+        query = query.casefold()
+        if len(query) < NGRAM:
+            candidates = range(len(self.values))
+        else:
+            postings = [self.grams.get(gram) for gram in _ngrams(query)]
+            if any(p is None for p in postings):
+                return np.array([], dtype=np.int64)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        # Trigram hanya menyaring kandidat; kecocokan substring tetap diperiksa
+        return np.array([i for i in candidates if query in self.values[i]], dtype=np.int64)
+
+class RowSearchIndex:
+    """Indeks pencarian atas kolom-kolom kategori sebuah DataFrame; hasilnya posisi baris (iloc)."""
+
+    def __init__(self, frame, columns):
+        self.size = len(frame)
+        self.columns = {}
+        for col in columns:
+            if col not in frame.columns:
+                continue
+            values = frame[col] if isinstance(frame[col].dtype, pd.CategoricalDtype) else frame[col].astype("category")
+            codes = values.cat.codes.to_numpy()
+            # Posisi baris dikelompokkan per kode kategori; tiap kelompok terurut naik
+            order = np.argsort(codes, kind="stable")
+            starts = np.searchsorted(codes[order], np.arange(len(values.cat.categories) + 1))
+            self.columns[col] = (SubstringIndex(values.cat.categories), order, starts)
+
+    def search(self, query, start=0, stop=None):
+        """Posisi baris (terurut) dalam [start, stop) yang salah satu kolomnya memuat `query`."""
+        stop = self.size if stop is None else stop
+        found = []
+        for vocabulary, order, starts in self.columns.values():
+            for code in vocabulary.matching(query):
+                rows = order[starts[code]:starts[code + 1]]
+                found.append(rows[np.searchsorted(rows, start):np.searchsorted(rows, stop)])
+        if not found:
+            return np.array([], dtype=np.int64)
+        rows = np.concatenate(found)
+        if len(rows) * 8 < stop - start:
+            return np.unique(rows)
+        # Hasil besar: tandai di mask selebar rentang, lebih cepat daripada mengurutkan
+        mask = np.zeros(stop - start, dtype=bool)
+        mask[rows - start] = True
+        return np.flatnonzero(mask) + start
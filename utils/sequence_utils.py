@@ -0,0 +1,54 @@
+import threading
+import pandas as pd
+import streamlit as st
+from utils.sheets_utils import get_worksheet
+
+# Penyedia ID berurutan untuk setiap worksheet.
+# High-water mark (ID terbesar yang pernah dibagikan) disimpan di memori proses dan
+# dipakai bersama oleh semua sesi, sehingga menambah data tidak perlu membaca seluruh sheet.
+# Lock memastikan dua sesi yang menyimpan bersamaan tidak pernah menerima ID yang sama.
+@st.cache_resource
+def _get_sequence_state():
+    return {"lock": threading.Lock(), "high_water": {}, "seeded": set()}
+
+def _max_id(values):
+    """Mencari ID integer terbesar dari daftar nilai kolom ID (nilai kosong/non-angka/negatif diabaikan)."""
+    # Vektor: kolom ID bertipe dari utils.schema tidak perlu dikonversi per nilai
+    ids = pd.to_numeric(pd.Series(values), errors="coerce")
+    highest = ids[ids >= 0].max()
+    return int(highest) if pd.notna(highest) else 0
+
+def allocate_ids(ws_name, count=1):
+    """
+    Mengalokasikan `count` ID berurutan untuk worksheet `ws_name`.
+    Sheet hanya dibaca (kolom ID saja) saat high-water mark belum pernah diisi.
+    """
+    state = _get_sequence_state()
+    with state["lock"]:
+        high_water = state["high_water"].get(ws_name, 0)
+        if ws_name not in state["seeded"]:
+            # Baris pertama kolom A adalah header
+            high_water = max(high_water, _max_id(get_worksheet(ws_name).col_values(1)[1:]))
+            state["seeded"].add(ws_name)
+        first_id = high_water + 1
+        state["high_water"][ws_name] = high_water + count
+    return list(range(first_id, first_id + count))
+
+def next_id(ws_name):
+    """Mengalokasikan satu ID baru untuk worksheet `ws_name`."""
+    return allocate_ids(ws_name, 1)[0]
+
+def reconcile_ids(ws_name, ids, complete=True):
+    """
+    Menyelaraskan high-water mark dengan ID yang terlihat saat cache data di-refresh.
+    Nilai hanya pernah dinaikkan: ID yang sudah dibagikan tidak akan dipakai ulang,
+    sementara data yang ditambahkan langsung di Google Sheets tetap dihormati.
+    `complete=False` dipakai untuk sebagian ID saja (mis. perubahan yang masih di antrian),
+    sehingga sheet tetap dibaca sekali saat alokasi pertama.
+    """
+    observed = _max_id(ids)
+    state = _get_sequence_state()
+    with state["lock"]:
+        state["high_water"][ws_name] = max(state["high_water"].get(ws_name, 0), observed)
+        if complete:
+            state["seeded"].add(ws_name)
@@ -0,0 +1,77 @@
+import streamlit as st
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+from utils.backends import FAKE_BACKENDS, open_fake_spreadsheet, seed_demo_data
+from utils.config_utils import get_bool_setting, get_float_setting, get_setting
+from utils.rate_limiter import ScheduledWorksheet, SheetsScheduler
+from utils.schema import SCHEMAS
+
+# --- Konfigurasi Google Sheets ---
+SCOPE = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+SERVICE_ACCOUNT_FILE = "service_account.json"
+SPREADSHEET_NAME = "Presensi Mentoring STT NF" # Ganti dengan nama spreadsheet Anda
+WORKSHEET_NAMES = tuple(SCHEMAS)
+# Header kolom setiap worksheet, sesuai data yang benar-benar ditulis oleh aplikasi (lihat utils.schema)
+WORKSHEET_HEADERS = {name: list(columns) for name, columns in SCHEMAS.items()}
+DEFAULT_FAKE_DB_PATH = "data/fake_sheets.sqlite3"
+
+# Batas default sedikit di bawah kuota standar Sheets API (60 baca dan 60 tulis per menit per pengguna)
+DEFAULT_READS_PER_MINUTE = 50
+DEFAULT_WRITES_PER_MINUTE = 50
+DEFAULT_BURST = 10
+
+# st.cache_resource menyimpan objek di level proses, sehingga client, spreadsheet,
+# dan worksheet di bawah ini dipakai bersama oleh semua sesi dan semua halaman.
+# Setelah pemanggilan pertama, mengambil handle tidak lagi memerlukan panggilan jaringan.
+@st.cache_resource
+def get_client():
+    """Membuat satu client gspread yang sudah terotorisasi untuk seluruh aplikasi."""
+    creds = ServiceAccountCredentials.from_json_keyfile_name(SERVICE_ACCOUNT_FILE, SCOPE)
+    return gspread.authorize(creds)
+
+def get_backend_name():
+    """Backend penyimpanan aktif: 'gspread' (default), 'memory', atau 'sqlite' (lihat utils.backends)."""
+    return str(get_setting("storage_backend", "gspread")).strip().lower()
+
+@st.cache_resource
+def get_spreadsheet():
+    """Membuka spreadsheet utama sekali saja dan menyimpan handle-nya."""
+    backend = get_backend_name()
+    if backend not in FAKE_BACKENDS:
+        return get_client().open(SPREADSHEET_NAME)
+    # Backend palsu untuk pengembangan/benchmark tanpa jaringan dan service_account.json
+    spreadsheet = open_fake_spreadsheet(
+        backend,
+        WORKSHEET_HEADERS,
+        latency=get_float_setting("fake_latency", 0.0),
+        db_path=get_setting("fake_db_path", DEFAULT_FAKE_DB_PATH),
+    )
+    if get_bool_setting("fake_seed_demo", False):
+        seed_demo_data(spreadsheet)
+    return spreadsheet
+
+@st.cache_resource
+def get_scheduler():
+    """Penjadwal bersama untuk semua panggilan Sheets API (lihat utils.rate_limiter)."""
+    return SheetsScheduler(
+        read_per_minute=get_float_setting("sheets_reads_per_minute", DEFAULT_READS_PER_MINUTE),
+        write_per_minute=get_float_setting("sheets_writes_per_minute", DEFAULT_WRITES_PER_MINUTE),
+        burst=get_float_setting("sheets_burst", DEFAULT_BURST),
+    )
+
+@st.cache_resource
+def get_scheduled_spreadsheet():
+    """Handle spreadsheet untuk panggilan level spreadsheet (mis. batch_update) lewat penjadwal kuota."""
+    return ScheduledWorksheet(get_spreadsheet(), get_scheduler())
+
+@st.cache_resource
+def get_worksheet(name):
+    """
+    Mengembalikan handle worksheet ('mentor', 'mentee', atau 'presensi') yang dipakai bersama.
+    Semua panggilan baca/tulis pada handle ini melewati penjadwal kuota.
+    """
+    return ScheduledWorksheet(get_spreadsheet().worksheet(name), get_scheduler())
+
+def scheduler_stats():
+    """Statistik penjadwal: jumlah panggilan baca/tulis, pembacaan yang digabung, dan total waktu tunggu."""
+    return dict(get_scheduler().stats)
@@ -0,0 +1,39 @@
+import pandas as pd
+
+# Lapisan deret waktu untuk grafik tren kehadiran.
+# Dari cube utils.aggregates dibentuk deret harian (DatetimeIndex `tanggal`, terurut, satu baris
+# per hari yang memiliki presensi) berisi jumlah per status dan `total`. Rollup mingguan,
+# bulanan, dan semester diturunkan dari deret harian lewat resample, sehingga grafik tren
+# hanya mengolah beberapa ratus titik berapa pun banyaknya baris presensi.
+
+# Aturan resample per periode; minggu dimulai Senin (sama dengan to_period('W')) dan diberi label tanggal awalnya
+PERIOD_RULES = {
+    "W": {"rule": "W-MON", "closed": "left", "label": "left"},
+    "M": {"rule": "MS"},
+    "Q": {"rule": "QS-JAN"},
+}
+SEMESTER = "S" # Semester Januari-Juni dan Juli-Desember, diturunkan dari rollup kuartalan
+
+def daily_series(cube):
+    """Deret jumlah harian (DatetimeIndex `tanggal`) dari cube; presensi tanpa tanggal diabaikan."""
+    daily = cube.groupby(level="tanggal").sum()
+    daily = daily[daily.index.notna()]
+    daily.index = pd.DatetimeIndex(daily.index, name="tanggal")
+    return daily.sort_index()
+
+def slice_dates(daily, start=None, end=None):
+    """Bagian deret harian dalam rentang [start, end] (slicing pada indeks terurut)."""
+    return daily.loc[start:end]
+
+def rollup(daily, period):
+    """Jumlah per periode ('W', 'M', 'Q', atau 'S'), berindeks tanggal awal periode; periode tanpa presensi dibuang."""
+    if daily.empty:
+        return daily.copy()
+    if period == SEMESTER:
+        quarterly = rollup(daily, "Q")
+        semester_start = pd.DatetimeIndex(
+            [pd.Timestamp(year=d.year, month=1 if d.month < 7 else 7, day=1) for d in quarterly.index], name="tanggal")
+        rolled = quarterly.groupby(semester_start).sum()
+    else:
+        rolled = daily.resample(**PERIOD_RULES[period]).sum()
+    return rolled[rolled["total"] > 0]
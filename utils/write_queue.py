@@ -0,0 +1,380 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import requests
+import streamlit as st
+from gspread.exceptions import APIError
+from gspread.utils import rowcol_to_a1
+
+from utils import local_store
+from utils.config_utils import get_setting
+from utils.cache_versions import get_version_registry
+from utils.rate_limiter import PRIORITY_WRITE, request_priority
+from utils.row_index import RowIndex
+from utils.sequence_utils import reconcile_ids
+from utils.sheets_utils import WORKSHEET_HEADERS, WORKSHEET_NAMES, get_scheduled_spreadsheet, get_worksheet
+
+# Antrian tulis (write-behind) untuk semua perubahan ke Google Sheets.
+# Setiap perubahan dicatat dulu ke jurnal SQLite di disk, pengguna langsung mendapat konfirmasi,
+# lalu thread latar belakang mengirimkannya ke Sheets dalam batch dan mengulang (retry)
+# dengan exponential backoff jika API membalas 429/5xx atau koneksi terputus.
+# Perubahan dirujuk berdasarkan ID (bukan nomor baris), sehingga baris fisiknya baru dicari saat dikirim.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = "data/write_queue.sqlite3"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+BASE_BACKOFF = 1.0 # detik
+MAX_BACKOFF = 64.0 # detik
+IDLE_POLL = 5.0 # detik, jaga-jaga jika ada pekerjaan tertunda tanpa sinyal
+
+def _is_retryable(error):
+    if isinstance(error, APIError):
+        return getattr(error.response, "status_code", None) in RETRYABLE_STATUS
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+def _backoff(attempts):
+    return min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (attempts - 1)) + random.uniform(0, 1)
+
+def _consecutive_runs(numbers):
+    """Mengelompokkan nomor kolom/baris (terurut) menjadi deret yang bersebelahan: [2, 3, 5] -> [[2, 3], [5]]."""
+    runs = []
+    for number in numbers:
+        if runs and runs[-1][-1] == number - 1:
+            runs[-1].append(number)
+        else:
+            runs.append([number])
+    return runs
+
+def _coalesce_ranges(cells):
+    """
+    Mengubah {baris: {kolom: nilai}} menjadi data batch_update dengan rentang sesedikit mungkin:
+    kolom bersebelahan dalam satu baris digabung, lalu baris berurutan dengan deret kolom
+    yang sama digabung menjadi satu rentang persegi (mis. 50 mentee yang dipindah mentor -> D5:D54).
+    """
+    blocks = [] # [baris_awal, baris_akhir, kolom_awal, kolom_akhir, values]
+    for row in sorted(cells):
+        for run in _consecutive_runs(sorted(cells[row])):
+            values = [cells[row][col] for col in run]
+            for block in blocks:
+                if block[1] == row - 1 and (block[2], block[3]) == (run[0], run[-1]):
+                    block[1] = row
+                    block[4].append(values)
+                    break
+            else:
+                blocks.append([row, row, run[0], run[-1], [values]])
+    return [
+        {"range": f"{rowcol_to_a1(first_row, first_col)}:{rowcol_to_a1(last_row, last_col)}", "values": values}
+        for first_row, last_row, first_col, last_col, values in blocks
+    ]
+
+def _job_records(payload):
+    """Pasangan (ID, {kolom: nilai}) dari sebuah job update."""
+    if "records" in payload:
+        return list(payload["records"].items())
+    return [(payload["id"], payload["changes"])]
+
+class WriteQueue:
+    """Jurnal perubahan di disk plus worker latar belakang yang mengirimkannya ke Google Sheets."""
+
+    def __init__(self, journal_path, spreadsheet, worksheets, listeners=()):
+        self.journal_path = journal_path
+        self.spreadsheet = spreadsheet # Untuk batch_update level spreadsheet (hapus banyak baris)
+        self.worksheets = worksheets
+        self.listeners = list(listeners) # Dipanggil dengan nama worksheet setelah flush berhasil
+        # Indeks ID -> baris fisik per worksheet, hanya diakses worker di bawah flush_lock
+        self.row_indexes = {name: RowIndex(ws) for name, ws in worksheets.items()}
+        self.wake_up = threading.Event()
+        self.flush_lock = threading.Lock()
+        self.last_flush_at = None
+        self.last_flush_ok = None
+        self.last_error = None
+        # seq job yang sudah terkirim ke Sheets tetapi belum terhapus dari jurnal (mis. DELETE jurnal gagal)
+        self.sent = set()
+        self._init_journal()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.journal_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_journal(self):
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, worksheet TEXT NOT NULL, kind TEXT NOT NULL, "
+                "payload TEXT NOT NULL, created_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "status TEXT NOT NULL DEFAULT 'pending', last_error TEXT)"
+            )
+
+    def start(self):
+        threading.Thread(target=self._run, name="bkpk-write-queue", daemon=True).start()
+        self.wake_up.set() # Kirim sisa jurnal dari proses sebelumnya
+
+    # --- Sisi pengguna (thread skrip Streamlit) ---
+    def enqueue(self, worksheet, kind, payload):
+        """Mencatat satu perubahan ke jurnal di disk dan membangunkan worker."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO jobs (worksheet, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (worksheet, kind, json.dumps(payload), time.time()),
+            )
+        self.wake_up.set()
+
+    def pending_jobs(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT seq, worksheet, kind, payload, attempts FROM jobs WHERE status = 'pending' ORDER BY seq"
+            ).fetchall()
+        return [
+            {"seq": seq, "worksheet": ws, "kind": kind, "payload": json.loads(payload), "attempts": attempts}
+            for seq, ws, kind, payload, attempts in rows
+        ]
+
+    def status(self):
+        with closing(self._connect()) as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "depth": counts.get("pending", 0),
+            "failed": counts.get("failed", 0),
+            "last_flush_at": self.last_flush_at,
+            "last_flush_ok": self.last_flush_ok,
+            "last_error": self.last_error,
+        }
+
+    # --- Sisi worker ---
+    def _run(self):
+        # Penulisan (dan pembacaan kolom ID yang dibutuhkannya) didahulukan oleh penjadwal kuota
+        with request_priority(PRIORITY_WRITE):
+            failures = 0
+            while True:
+                self.wake_up.wait(IDLE_POLL)
+                self.wake_up.clear()
+                while True:
+                    try:
+                        retry_delay = self.flush()
+                        failures = 0
+                    except Exception as e: # Jangan hentikan thread karena error jurnal SQLite atau error tak terduga
+                        failures += 1
+                        self.last_flush_at = time.time()
+                        self.last_flush_ok = False
+                        self.last_error = str(e)
+                        logger.exception("Antrian tulis gagal diproses, akan dicoba lagi: %s", e)
+                        retry_delay = _backoff(failures)
+                    if retry_delay is None:
+                        break
+                    time.sleep(retry_delay) # Backoff tidak dipersingkat oleh enqueue baru
+
+    def flush(self):
+        """
+        Mengirim semua perubahan tertunda. Perubahan per worksheet digabung menjadi batch
+        (urutan antar-perubahan dalam satu worksheet tetap dijaga).
+        Mengembalikan jeda backoff jika ada batch yang harus diulang, atau None jika selesai.
+        """
+        with self.flush_lock:
+            jobs = self.pending_jobs()
+            if not jobs:
+                return None
+            retry_delay = None
+            by_worksheet = {}
+            for job in jobs:
+                by_worksheet.setdefault(job["worksheet"], []).append(job)
+            for ws_name, ws_jobs in by_worksheet.items():
+                for batch in self._consecutive_batches(ws_jobs):
+                    delay = self._flush_batch(ws_name, batch)
+                    if delay is not None:
+                        retry_delay = delay if retry_delay is None else min(retry_delay, delay)
+                        break # Perubahan berikutnya di worksheet ini menunggu batch ini berhasil
+            return retry_delay
+
+    @staticmethod
+    def _consecutive_batches(jobs):
+        batch = []
+        for job in jobs:
+            if batch and batch[-1]["kind"] != job["kind"]:
+                yield batch
+                batch = []
+            batch.append(job)
+        if batch:
+            yield batch
+
+    def _flush_batch(self, ws_name, batch):
+        seqs = [job["seq"] for job in batch]
+        try:
+            ws = self.worksheets[ws_name] # Worksheet tak dikenal: job gagal permanen
+            # Job yang ditolak (seq -> alasan) ditandai gagal permanen; job lain dalam batch tetap terkirim
+            rejected = getattr(self, f"_apply_{batch[0]['kind']}")(ws_name, ws, batch) or {}
+        except Exception as e:
+            self.last_flush_at = time.time()
+            self.last_flush_ok = False
+            self.last_error = f"{ws_name}: {e}"
+            attempts = max(job["attempts"] for job in batch) + 1
+            retryable = _is_retryable(e)
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "UPDATE jobs SET attempts = attempts + 1, last_error = ?, status = ? WHERE seq = ?",
+                    [(str(e), "pending" if retryable else "failed", seq) for seq in seqs],
+                )
+            if not retryable:
+                logger.error("Perubahan ke worksheet '%s' gagal permanen: %s", ws_name, e)
+                return None
+            logger.warning("Perubahan ke worksheet '%s' akan diulang: %s", ws_name, e)
+            return _backoff(attempts)
+
+        sent = [seq for seq in seqs if seq not in rejected]
+        self.sent.update(sent)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE jobs SET attempts = attempts + 1, last_error = ?, status = 'failed' WHERE seq = ?",
+                [(reason, seq) for seq, reason in rejected.items()],
+            )
+            conn.executemany("DELETE FROM jobs WHERE seq = ?", [(seq,) for seq in sent])
+        self.sent.difference_update(sent)
+        self.last_flush_at = time.time()
+        self.last_flush_ok = not rejected
+        self.last_error = None
+        for seq, reason in rejected.items():
+            self.last_error = f"{ws_name}: {reason}"
+            logger.error("Perubahan ke worksheet '%s' gagal permanen: %s", ws_name, reason)
+        for listener in self.listeners:
+            try:
+                listener(ws_name)
+            except Exception as e:
+                logger.warning("Listener flush untuk '%s' gagal: %s", ws_name, e)
+        return None
+
+    def _apply_append(self, ws_name, ws, batch):
+        index = self.row_indexes[ws_name]
+        # Job yang mungkin sudah sampai ke Sheets (percobaan sebelumnya gagal, atau terkirim tetapi belum
+        # terhapus dari jurnal): kolom ID dibaca ulang dan baris yang ID-nya sudah ada tidak ditulis lagi
+        resent = {job["seq"] for job in batch if job["attempts"] or job["seq"] in self.sent}
+        existing = index.refresh() if resent else (index.positions or {})
+        rows, rejected = [], {}
+        for job in batch:
+            job_rows = job["payload"]["rows"]
+            if job["seq"] in resent:
+                rows.extend(row for row in job_rows if str(row[0]) not in existing)
+                continue
+            # Percobaan pertama: ID yang sudah ada berarti bentrok dengan baris lain (mis. ditambahkan
+            # langsung di Sheets), bukan kiriman ulang; job ditolak agar baris tidak hilang diam-diam
+            taken = [row[0] for row in job_rows if str(row[0]) in existing]
+            if taken:
+                rejected[job["seq"]] = f"ID {', '.join(map(str, taken))} sudah dipakai baris lain"
+            else:
+                rows.extend(job_rows)
+        if rows:
+            response = ws.append_rows(rows)
+            index.appended([row[0] for row in rows], response)
+        return rejected
+
+    def _apply_update(self, ws_name, ws, batch):
+        header = WORKSHEET_HEADERS[ws_name]
+        changes = {} # ID -> {kolom: nilai}; perubahan berurutan pada ID yang sama digabung
+        for job in batch:
+            for record_id, columns in _job_records(job["payload"]):
+                changes.setdefault(str(record_id), {}).update(columns)
+        # Nomor baris diambil dari indeks, tanpa membaca baris sebelum menulis
+        positions = self.row_indexes[ws_name].lookup(changes)
+        cells = {}
+        for record_id, columns in changes.items():
+            row = positions.get(record_id)
+            if row is None:
+                continue # Baris sudah dihapus
+            # Hanya sel yang berubah yang ditulis (kolom A = ID tidak pernah diubah)
+            cells[row] = {header.index(col) + 1: value for col, value in columns.items() if col in header[1:]}
+        data = _coalesce_ranges(cells)
+        if data:
+            ws.batch_update(data) # Semua perubahan dalam satu permintaan
+
+    def _apply_delete(self, ws_name, ws, batch):
+        index = self.row_indexes[ws_name]
+        ids = [record_id for job in batch for record_id in job["payload"].get("ids", [job["payload"].get("id")])]
+        rows = set(index.lookup(ids).values())
+        if not rows:
+            return # Semua baris sudah dihapus
+        # Deret baris bersebelahan digabung menjadi satu deleteDimension, diurutkan dari bawah ke atas
+        # agar nomor baris yang belum dihapus tidak bergeser; semuanya dikirim dalam satu batch_update
+        delete_requests = [
+            {"deleteDimension": {"range": {
+                "sheetId": ws.id, "dimension": "ROWS", "startIndex": run[0] - 1, "endIndex": run[-1],
+            }}}
+            for run in reversed(_consecutive_runs(sorted(rows)))
+        ]
+        try:
+            self.spreadsheet.batch_update({"requests": delete_requests})
+        except Exception:
+            index.invalidate() # Hasilnya tidak pasti (mis. timeout): baca ulang kolom ID sebelum mencoba lagi
+            raise
+        index.deleted(rows)
+
+@st.cache_resource
+def get_write_queue():
+    worksheets = {name: get_worksheet(name) for name in WORKSHEET_NAMES}
+    listeners = []
+    if local_store.is_enabled():
+        sync_worker = local_store.get_sync_worker()
+        listeners.append(lambda ws_name: sync_worker.sync([ws_name]))
+    # Setelah data benar-benar sampai di Sheets (dan mirror tersinkron), naikkan versi worksheet
+    # tersebut: hanya cache yang bergantung padanya yang dihitung ulang
+    versions = get_version_registry()
+    listeners.append(versions.bump)
+    queue = WriteQueue(get_setting("write_queue_path", DEFAULT_JOURNAL_PATH), get_scheduled_spreadsheet(), worksheets, listeners)
+
+    # ID pada perubahan yang belum terkirim sudah dibagikan: jangan sampai dialokasikan ulang
+    for job in queue.pending_jobs():
+        if job["kind"] == "append":
+            reconcile_ids(job["worksheet"], [row[0] for row in job["payload"]["rows"]], complete=False)
+    queue.start()
+    return queue
+
+def enqueue_append(ws_name, rows):
+    """Menambahkan baris (list of list, kolom A = ID) ke worksheet lewat antrian."""
+    get_write_queue().enqueue(ws_name, "append", {"rows": rows})
+
+def enqueue_update(ws_name, record_id, changes, previous=None):
+    """
+    Mengubah kolom pada baris ber-ID `record_id` lewat antrian. `changes` adalah dict {kolom: nilai}.
+    Jika `previous` (data baris sebelumnya) diberikan, hanya kolom yang nilainya berbeda yang dikirim.
+    Mengembalikan False jika tidak ada yang berubah.
+    """
+    if previous is not None:
+        changes = {col: value for col, value in changes.items() if str(previous.get(col)) != str(value)}
+    if not changes:
+        return False
+    get_write_queue().enqueue(ws_name, "update", {"id": int(record_id), "changes": changes})
+    return True
+
+def enqueue_updates(ws_name, records):
+    """
+    Mengubah banyak baris sekaligus lewat satu job antrian. `records` adalah dict {ID: {kolom: nilai}}.
+    Semua perubahan dikirim dalam satu batch_update dengan rentang yang digabung.
+    """
+    if not records:
+        return False
+    payload = {"records": {str(int(record_id)): changes for record_id, changes in records.items()}}
+    get_write_queue().enqueue(ws_name, "update", payload)
+    return True
+
+def enqueue_delete(ws_name, record_id):
+    """Menghapus baris ber-ID `record_id` lewat antrian."""
+    get_write_queue().enqueue(ws_name, "delete", {"id": int(record_id)})
+
+def enqueue_deletes(ws_name, record_ids):
+    """Menghapus banyak baris sekaligus lewat satu job antrian (satu batch_update saat dikirim)."""
+    if not record_ids:
+        return False
+    get_write_queue().enqueue(ws_name, "delete", {"ids": [int(record_id) for record_id in record_ids]})
+    return True
+
+def queue_status():
+    """Ringkasan antrian: jumlah tertunda/gagal serta waktu dan hasil flush terakhir."""
+    return get_write_queue().status()